@@ -0,0 +1,63 @@
+import random
+import time
+
+from src.bitboard import BitboardGameGraph
+from src.algoritm import AlphaBetaAlgorithm
+
+
+# Сравнение числа узлов по глубинам итеративного углубления без упорядочивания
+# ходов и PVS (порядок generate_moves, как раньше) и с ними — все вместе и по
+# одному. Позиции — случайные дебюты в центре доски 20x20, ход за компьютером (O).
+# Поиск выигрыша четверками отключен, чтобы каждая позиция шла в альфа-бета
+
+# Параметры поиска
+board_size = 20
+max_depth = 4
+positions = 3  # Количество позиций
+stones = 8  # Камней в каждой позиции
+seed = 5
+
+OFF = dict(
+    pvs=False, aspiration=None, killers=False, history=False, static_ordering=False
+)
+configs = {
+    "без упорядочивания": OFF,
+    "PVS": {**OFF, "pvs": True},
+    "окна стремления": {**OFF, "aspiration": 50},
+    "ходы-убийцы": {**OFF, "killers": True},
+    "таблица истории": {**OFF, "history": True},
+    "статическая оценка": {**OFF, "static_ordering": True},
+    "все вместе": {},
+}
+
+rng = random.Random(seed)
+games = []
+for _ in range(positions):
+    game = BitboardGameGraph(board_size=board_size, win_count=5)
+    center = board_size // 2
+    placed = 0
+    while placed < stones:
+        x = center + rng.randrange(-3, 4)
+        y = center + rng.randrange(-3, 4)
+        if game.apply_move(x, y, 1 if placed % 2 == 0 else -1):
+            placed += 1
+    games.append(game)
+
+for name, options in configs.items():
+    depth_nodes = [0] * (max_depth + 1)
+    started = time.time()
+    for game in games:
+        ai = AlphaBetaAlgorithm(
+            game, max_depth=max_depth, time_limit=1000, threat_search=False, **options
+        )
+        ai.find_best_move(-1)
+        for depth, nodes in ai.stats["depth_nodes"].items():
+            depth_nodes[depth] += nodes
+    elapsed = time.time() - started
+    by_depth = ", ".join(
+        f"{depth}: {nodes}" for depth, nodes in enumerate(depth_nodes) if depth
+    )
+    print(
+        f"{name}: узлов {sum(depth_nodes)} (по глубинам {by_depth}), "
+        f"{elapsed:.2f} с"
+    )
@@ -0,0 +1,72 @@
+import os
+import random
+import time
+
+from src.bitboard import BitboardGameGraph
+from src.algoritm import AlphaBetaAlgorithm
+from src.book import OpeningBook, Symmetries
+
+
+# Построение книги дебютов самоигрой. Первый ход крестиков (человека в main.py)
+# случаен в центральной области, дальше оба игрока ходят поиском, а крестики
+# с вероятностью explore делают случайный ход рядом с камнями, чтобы партии
+# расходились. Каждая просчитанная позиция записывается в книгу вместе с ходом,
+# оценкой и глубиной. Уже существующая книга дополняется: из двух записей
+# одной позиции остается более глубокая
+
+# Параметры построения
+book_path = "opening.book"
+board_size = 20
+win_count = 5
+games = 100  # Количество партий
+plies = 8  # Сколько ходов каждой партии просчитывать
+max_depth = 3  # Глубина поиска; main.py берет из книги записи не мельче своей
+time_limit = 60  # Время на ход, с
+center = 3  # Первый ход — не дальше center клеток от центра
+explore = 0.3
+seed = 0
+
+rng = random.Random(seed)
+symmetries = Symmetries(board_size)
+entries = OpeningBook(book_path).entries() if os.path.exists(book_path) else {}
+start_count = len(entries)
+started = time.time()
+
+for game_number in range(games):
+    game = BitboardGameGraph(board_size=board_size, win_count=win_count)
+    ai = AlphaBetaAlgorithm(game, max_depth=max_depth, time_limit=time_limit)
+    middle = board_size // 2
+    first = (
+        middle + rng.randint(-center, center),
+        middle + rng.randint(-center, center),
+    )
+    game.apply_move(*first, 1)
+    player = -1
+    for _ in range(plies):
+        move = ai.find_best_move(player)
+        if move is None:
+            break
+        stats = ai.stats
+        if stats["value"] is not None and stats["depth"] > 0:
+            OpeningBook.record(
+                entries,
+                symmetries,
+                game.board,
+                player,
+                move,
+                stats["value"],
+                stats["depth"],
+            )
+        if player == 1 and rng.random() < explore:
+            move = rng.choice(game.generate_moves())
+        game.apply_move(*move, player)
+        if game.check_winner(player):
+            break
+        player = -player
+    print(
+        f"Партия {game_number + 1}/{games}: позиций в книге {len(entries)}, "
+        f"{time.time() - started:.1f} с"
+    )
+
+OpeningBook.write(book_path, board_size, win_count, entries)
+print(f"Книга {book_path}: {len(entries)} позиций (новых {len(entries) - start_count})")
@@ -1,10 +1,16 @@
-from src.graph import GameGraph
+import os
+
+from src.bitboard import BitboardGameGraph
 from src.algoritm import AlphaBetaAlgorithm
+from src.book import OpeningBook
+
+BOOK_PATH = "opening.book"  # Книга дебютов, построенная build_book.py
 
 def main():
     # Инициализация игры
-    game = GameGraph(board_size=20, win_count=5)  # Игровая доска 20x20 и 5 в ряд для победы
-    ai = AlphaBetaAlgorithm(game, max_depth=2, time_limit=20)  # Алгоритм альфа-бета с глубиной 2 и временем 1 секунда на ход
+    game = BitboardGameGraph(board_size=20, win_count=5)  # Игровая доска 20x20 и 5 в ряд для победы
+    book = OpeningBook(BOOK_PATH) if os.path.exists(BOOK_PATH) else None
+    ai = AlphaBetaAlgorithm(game, max_depth=2, time_limit=20, book=book)  # Алгоритм альфа-бета с глубиной 2 и временем 1 секунда на ход
 
     # Настройка текущего игрока
     game.current_player = 1  # 1 - крестики (X), -1 - нолики (O)
@@ -43,6 +49,14 @@ def main():
                 break
             game.apply_move(x, y, game.current_player)
             print(f"Компьютер сделал ход: {x} {y}")
+            stats = ai.stats
+            print(
+                f"Глубина поиска: {stats['depth']}, узлов: {stats['nodes']}, "
+                f"скорость: {stats['nps']:.0f} узлов/с"
+            )
+            print(f"Узлов по глубинам: {stats['depth_nodes']}")
+            if stats["source"] == "book":
+                print("Ход взят из книги дебютов")
             if game.check_winner(game.current_player):
                 print("\nКомпьютер победил!")
                 game.print_board()
@@ -54,5 +68,7 @@ def main():
         # Смена текущего игрока
         game.current_player = -game.current_player
 
+    ai.close()  # Останавливает процессы параллельного поиска, если они были
+
 if __name__ == "__main__":
     main()
@@ -1,43 +1,193 @@
+import multiprocessing
 import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from src.graph import WIN
+from src.threats import ThreatSolver
+from src.transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+
+class SearchTimeout(Exception):
+    """Время на поиск истекло, незавершенная итерация отбрасывается."""
 
 
 class AlphaBetaAlgorithm:
-    def __init__(self, game_graph, max_depth=2, time_limit=1):
+    def __init__(
+        self,
+        game_graph,
+        max_depth=2,
+        time_limit=1,
+        tt_size=1 << 20,
+        check_interval=256,
+        workers=1,
+        pvs=True,
+        aspiration=50,
+        killers=True,
+        history=True,
+        static_ordering=True,
+        threat_search=True,
+        threat_depth=10,
+        threat_nodes=20000,
+        book=None,
+        book_depth=None,
+    ):
         self.game_graph = game_graph
-        self.max_depth = max_depth
+        self.max_depth = max_depth  # Предельная глубина, None — пока не кончится время
         self.time_limit = time_limit
+        self.check_interval = check_interval  # Через сколько узлов проверять часы
+        self.workers = workers  # Число процессов для параллельного поиска из корня
+        self.pvs = pvs  # Ходы после первого проверяются нулевым окном
+        self.aspiration = aspiration  # Полуширина окна стремления, None — без окна
+        self.use_killers = killers  # Ходы, давшие отсечение на той же глубине
+        self.use_history = history  # Таблица истории: отсечения по ходам за весь поиск
+        self.static_ordering = static_ordering  # Сортировка ходов по move_score
+        self.killer_moves = {}  # Глубина от корня -> до двух ходов-убийц
+        self.history = {1: {}, -1: {}}  # Игрок -> ход -> сумма depth**2 по отсечениям
+        self.root_depth = 0
         self.start_time = None
+        self.deadline = None
+        self.nodes = 0
+        self.next_check = 0
+        self.stats = {}
+        self.transposition_table = TranspositionTable(tt_size)
+        self.executor = None  # Пул процессов параллельного поиска, создается один раз
+        self.shared_bound = None  # Общая граница лучшей оценки корня для процессов
+        self.book = book  # Книга дебютов OpeningBook, None — без книги
+        # Наименьшая глубина записи книги, None — max_depth. Без обеих книга
+        # не используется: поиск по времени может уйти глубже любой записи
+        self.book_depth = book_depth
+        # Поиск выигрыша непрерывными четверками перед альфа-бета поиском
+        self.threat_solver = (
+            ThreatSolver(game_graph, threat_depth, threat_nodes)
+            if threat_search
+            else None
+        )
 
     def alpha_beta(self, depth, alpha, beta, maximizing_player):
-        """Алгоритм альфа-бета отсечения."""
-        if depth == 0 or abs(self.game_graph.evaluate()) == 100:
-            return self.game_graph.evaluate()
+        """Алгоритм альфа-бета отсечения с таблицей транспозиций."""
+        # Часы проверяются раз в check_interval узлов, а не в каждом узле
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self.next_check = self.nodes + self.check_interval
+            if time.time() > self.deadline:
+                raise SearchTimeout
+
+        key = self.game_graph.position_key(maximizing_player)
+        entry = self.transposition_table.probe(key)
+        tt_move = None
+        if entry is not None:
+            _, entry_depth, flag, value, tt_move, _ = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if beta <= alpha:
+                    return value
 
-        if time.time() - self.start_time > self.time_limit:
-            return 0  # Временной лимит, возвращаем нейтральную оценку
+        evaluation = self.game_graph.evaluate()
+        if depth == 0 or abs(evaluation) == WIN:
+            self.transposition_table.store(key, depth, EXACT, evaluation, None)
+            return evaluation
 
+        alpha_start, beta_start = alpha, beta
+        best_move = None
+        player = 1 if maximizing_player else -1
+        ply = self.root_depth - depth
+        moves = self.order_moves(
+            self.generate_prioritized_moves(), tt_move, player, ply, depth
+        )
+        # PVS: первый ход ищется с полным окном, остальные — нулевым окном, которое
+        # только проверяет, лучше ли ход найденного (оценки целые). Если лучше,
+        # ход ищется заново с полным окном.
         if maximizing_player:
             max_eval = -float("inf")
-            for x, y in self.generate_prioritized_moves():                
+            for i, (x, y) in enumerate(moves):
                 self.game_graph.apply_move(x, y, 1)  # Ход компьютера
-                eval = self.alpha_beta(depth - 1, alpha, beta, False)
-                self.game_graph.undo_move(x, y)
-                max_eval = max(max_eval, eval)
+                try:
+                    if i == 0 or not self.pvs:
+                        eval = self.alpha_beta(depth - 1, alpha, beta, False)
+                    else:
+                        eval = self.alpha_beta(depth - 1, alpha, alpha + 1, False)
+                        if alpha < eval < beta:
+                            eval = self.alpha_beta(depth - 1, alpha, beta, False)
+                finally:
+                    self.game_graph.undo_move(x, y)
+                if eval > max_eval:
+                    max_eval, best_move = eval, (x, y)
                 alpha = max(alpha, eval)
                 if beta <= alpha:
+                    self.record_cutoff((x, y), player, ply, depth)
                     break
-            return max_eval
+            value = max_eval
         else:
             min_eval = float("inf")
-            for x, y in self.generate_prioritized_moves():
+            for i, (x, y) in enumerate(moves):
                 self.game_graph.apply_move(x, y, -1)  # Ход игрока
-                eval = self.alpha_beta(depth - 1, alpha, beta, True)
-                self.game_graph.undo_move(x, y)
-                min_eval = min(min_eval, eval)
+                try:
+                    if i == 0 or not self.pvs:
+                        eval = self.alpha_beta(depth - 1, alpha, beta, True)
+                    else:
+                        eval = self.alpha_beta(depth - 1, beta - 1, beta, True)
+                        if alpha < eval < beta:
+                            eval = self.alpha_beta(depth - 1, alpha, beta, True)
+                finally:
+                    self.game_graph.undo_move(x, y)
+                if eval < min_eval:
+                    min_eval, best_move = eval, (x, y)
                 beta = min(beta, eval)
                 if beta <= alpha:
+                    self.record_cutoff((x, y), player, ply, depth)
                     break
-            return min_eval
+            value = min_eval
+
+        if value <= alpha_start:
+            flag = UPPER
+        elif value >= beta_start:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.transposition_table.store(key, depth, flag, value, best_move)
+        return value
+
+    def order_moves(self, moves, tt_move, player=None, ply=None, depth=0):
+        """Упорядочивает ходы: лучший ход из таблицы транспозиций, затем ходы-убийцы
+        глубины ply, затем остальные по статической оценке move_score и таблице
+        истории игрока player. Без player ставит первым только tt_move.
+        Сортировка устойчивая, поэтому при равных оценках сохраняется порядок
+        generate_moves."""
+        first = [tt_move] if tt_move is not None and tt_move in moves else []
+        if self.use_killers and ply is not None:
+            for move in self.killer_moves.get(ply, ()):
+                if move not in first and move in moves:
+                    first.append(move)
+        rest = [move for move in moves if move not in first] if first else moves
+        if player is None or len(rest) < 2:
+            return first + rest
+
+        history = self.history[player] if self.use_history else {}
+        # Статическая оценка стоит двух пересчетов линий на ход, поэтому на узлах
+        # глубины 1, где дети только оцениваются, хватает таблицы истории
+        if self.static_ordering and depth >= 2:
+            scores = {move: self.game_graph.move_score(*move, player) for move in rest}
+            rest = sorted(rest, key=lambda move: (-scores[move], -history.get(move, 0)))
+        elif history:
+            rest = sorted(rest, key=lambda move: -history.get(move, 0))
+        return first + rest
+
+    def record_cutoff(self, move, player, ply, depth):
+        """Запоминает ход, давший отсечение: в ходы-убийцы глубины ply и в таблицу
+        истории (с весом depth**2, чтобы отсечения ближе к корню весили больше)."""
+        if self.use_killers:
+            killers = self.killer_moves.setdefault(ply, [])
+            if move not in killers:
+                killers.insert(0, move)
+                del killers[2:]
+        if self.use_history:
+            history = self.history[player]
+            history[move] = history.get(move, 0) + depth * depth
 
     def generate_prioritized_moves(self):
         """Генерация ходов с приоритетом: блокировка ходов игрока и возможности для победы."""
@@ -59,36 +209,351 @@ class AlphaBetaAlgorithm:
 
     def find_threat_moves(self, player):
         """Нахождение угроз или победных ходов для указанного игрока (player)."""
-        moves = []
-        for x, y in self.game_graph.generate_moves():
-            self.game_graph.apply_move(x, y, player)
-            if self.game_graph.check_winner(player):  # Если ход ведет к победе
-                moves.append((x, y))
-            self.game_graph.undo_move(x, y)
-        return moves
+        moves = self.game_graph.generate_moves()
+        if self.game_graph.check_winner(player):  # Победа уже есть на доске
+            return moves
+        # Ход ведет к победе, если собирает линию через свою клетку
+        return [
+            (x, y) for x, y in moves if self.game_graph.is_winning_move(x, y, player)
+        ]
 
     def find_best_move(self, player):
-        """Поиск лучшего хода с учетом времени."""
+        """Поиск лучшего хода итеративным углублением с учетом времени.
+        Глубины 1, 2, 3... ищутся по очереди, пока не кончится время или не будет
+        достигнута max_depth; возвращается лучший ход последней завершенной глубины."""
         self.start_time = time.time()
+        self.deadline = self.start_time + self.time_limit
+        self.nodes = 0
+        self.next_check = self.check_interval
+        self.transposition_table.new_search()
+        self.killer_moves = {}
+        self.history = {1: {}, -1: {}}
+
+        # Форсированный выигрыш четверками находится быстрее и глубже альфа-бета
+        if self.threat_solver is not None:
+            sequence = self.threat_solver.solve(player)
+            if sequence is not None:
+                value = WIN * player
+                return self.finish_early("threats", sequence, value, len(sequence))
+
+        # Позиция из книги дебютов, просчитанная не мельче book_depth (max_depth)
+        book_depth = self.max_depth if self.book_depth is None else self.book_depth
+        if self.book is not None and book_depth is not None:
+            entry = self.book.lookup(self.game_graph, player)
+            if entry is not None and entry[2] >= book_depth:
+                move, value, depth = entry
+                return self.finish_early("book", [move], value, depth)
+
+        # Сначала оцениваем приоритетные ходы (блокировка или победа)
+        moves = self.generate_prioritized_moves()
+        best_move = moves[0] if moves else None
+        best_value = None
+        completed_depth = 0
+        max_depth = self.max_depth or len(self.game_graph.generate_moves())
+
+        parallel = self.workers > 1 and len(moves) > 1
+        best_pv = []
+        depth_nodes = {}  # Глубина -> число узлов ее итерации
+        aspiration_researches = 0
+        for depth in range(1, max_depth + 1):
+            nodes_before = self.nodes
+            pv = None
+            try:
+                if not parallel:
+                    # Окно стремления вокруг оценки прошлой глубины
+                    window = None
+                    if (
+                        self.aspiration
+                        and best_value is not None
+                        and abs(best_value) != WIN
+                    ):
+                        window = (
+                            best_value - self.aspiration,
+                            best_value + self.aspiration,
+                        )
+                    move, value = self.search_root(
+                        depth, player, moves, best_move, window
+                    )
+                    if window is not None and not window[0] < value < window[1]:
+                        # Оценка вышла за окно и известна только как граница
+                        aspiration_researches += 1
+                        move, value = self.search_root(depth, player, moves, best_move)
+                else:
+                    move, value, pv = self.search_root_parallel(
+                        depth, player, moves, best_move
+                    )
+            except SearchTimeout:
+                break
+            best_move, best_value, completed_depth = move, value, depth
+            best_pv = pv
+            depth_nodes[depth] = self.nodes - nodes_before
+            # Победа или поражение уже доказаны, глубже искать незачем
+            if abs(value) == WIN or time.time() > self.deadline:
+                break
+
+        if best_pv is None:
+            best_pv = self.principal_variation(player, best_move, completed_depth)
+        elapsed = time.time() - self.start_time
+        self.stats = {
+            "depth": completed_depth,
+            "nodes": self.nodes,
+            "time": elapsed,
+            "nps": self.nodes / elapsed if elapsed > 0 else 0.0,
+            "depth_nodes": depth_nodes,
+            "aspiration_researches": aspiration_researches,
+            "value": best_value,
+            "pv": best_pv,
+            "threat_nodes": self.threat_solver.nodes if self.threat_solver else 0,
+            "source": "search",
+        }
+        return best_move
+
+    def finish_early(self, source, pv, value, depth):
+        """Заполняет stats для хода, найденного без альфа-бета поиска
+        (source: "threats" или "book"), и возвращает первый ход pv."""
+        self.stats = {
+            "depth": depth,
+            "nodes": 0,
+            "time": time.time() - self.start_time,
+            "nps": 0.0,
+            "depth_nodes": {},
+            "aspiration_researches": 0,
+            "value": value,
+            "pv": pv,
+            "threat_nodes": self.threat_solver.nodes if self.threat_solver else 0,
+            "source": source,
+        }
+        return pv[0]
+
+    def search_root(self, depth, player, moves, pv_move, window=None):
+        """Поиск на глубину depth из корня. Ход главного варианта прошлой итерации
+        проверяется первым, остальные — нулевым окном (PVS). window — окно
+        стремления (low, high); если оценка не попала строго внутрь окна, она
+        только граница, и искать нужно заново без окна.
+        Возвращает (лучший ход, оценка)."""
+        self.root_depth = depth
+        low, high = window or (-float("inf"), float("inf"))
         best_move = None
         best_value = -float("inf") if player == 1 else float("inf")
 
-        # Сначала оцениваем приоритетные ходы (блокировка или победа)
-        for x, y in self.generate_prioritized_moves():
+        for i, (x, y) in enumerate(self.order_moves(moves, pv_move, player, 0, depth)):
             self.game_graph.apply_move(x, y, player)
-            move_value = self.alpha_beta(
-                self.max_depth - 1, -float("inf"), float("inf"), player == -1
-            )
-            self.game_graph.undo_move(x, y)
+            # Ход, не лучший уже найденного, достаточно опровергнуть, поэтому
+            # окно сужается по лучшей оценке: выбранный ход от этого не меняется
+            try:
+                if player == 1:
+                    alpha = max(best_value, low)
+                    if i == 0 or not self.pvs:
+                        move_value = self.alpha_beta(depth - 1, alpha, high, False)
+                    else:
+                        move_value = self.alpha_beta(depth - 1, alpha, alpha + 1, False)
+                        if alpha < move_value < high:
+                            move_value = self.alpha_beta(depth - 1, alpha, high, False)
+                else:
+                    beta = min(best_value, high)
+                    if i == 0 or not self.pvs:
+                        move_value = self.alpha_beta(depth - 1, low, beta, True)
+                    else:
+                        move_value = self.alpha_beta(depth - 1, beta - 1, beta, True)
+                        if low < move_value < beta:
+                            move_value = self.alpha_beta(depth - 1, low, beta, True)
+            finally:
+                self.game_graph.undo_move(x, y)
 
             if (player == 1 and move_value > best_value) or (
                 player == -1 and move_value < best_value
             ):
                 best_value = move_value
                 best_move = (x, y)
+            if (player == 1 and best_value >= high) or (
+                player == -1 and best_value <= low
+            ):
+                break  # Оценка выше окна стремления
+
+        if best_move is not None and low < best_value < high:
+            self.transposition_table.store(
+                self.game_graph.position_key(player == 1),
+                depth,
+                EXACT,
+                best_value,
+                best_move,
+            )
+        return best_move, best_value
+
+    def search_options(self):
+        """Настройки упорядочивания и PVS для процессов параллельного поиска."""
+        return {
+            "pvs": self.pvs,
+            "killers": self.use_killers,
+            "history": self.use_history,
+            "static_ordering": self.static_ordering,
+        }
+
+    def executor_pool(self):
+        """Пул процессов параллельного поиска. Создается при первом поиске и живет
+        до close(), поэтому доска и таблицы не передаются процессам на каждом ходе."""
+        if self.executor is None:
+            self.shared_bound = multiprocessing.Value("d", 0.0)
+            self.executor = ProcessPoolExecutor(
+                self.workers,
+                initializer=_init_worker,
+                initargs=(
+                    self.game_graph,
+                    self.transposition_table.size,
+                    self.check_interval,
+                    self.shared_bound,
+                    self.search_options(),
+                ),
+            )
+        return self.executor
 
-            # Прерываем поиск, если время истекло
-            if time.time() - self.start_time > self.time_limit:
+    def close(self):
+        """Останавливает процессы параллельного поиска."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+            self.shared_bound = None
+
+    def search_root_parallel(self, depth, player, moves, pv_move):
+        """Поиск на глубину depth, в котором ходы корня делятся между процессами.
+
+        Каждый процесс ищет со своей копией доски, а лучшая оценка корня хранится
+        в общей памяти: следующие ходы корня ищутся с окном, суженным по ней, и
+        получают отсечения. Граница берется на 1 слабее лучшей оценки (оценки
+        целые), поэтому все ходы с лучшей оценкой получают точное значение, и при
+        равенстве выбирается первый по порядку ход. Каждый ход корня ищется
+        с пустой таблицей транспозиций и пустыми таблицами упорядочивания, поэтому
+        его точная оценка не зависит от того, какой процесс и после каких ходов
+        его искал: при том же числе процессов результат тот же.
+        Окна стремления в этом режиме не используются.
+        Возвращает (лучший ход, оценка, главный вариант)."""
+        executor = self.executor_pool()
+        shared_bound = self.shared_bound
+        ordered = self.order_moves(moves, pv_move, player, 0, depth)
+        with shared_bound.get_lock():
+            shared_bound.value = -float("inf") if player == 1 else float("inf")
+
+        # Доска процессов догоняет текущую позицию по списку камней
+        board = self.game_graph.board
+        position = (
+            self.game_graph.hash,
+            [
+                (x, y, int(board[x][y]))
+                for x in range(self.game_graph.board_size)
+                for y in range(self.game_graph.board_size)
+                if board[x][y] != 0
+            ],
+        )
+        futures = [
+            executor.submit(
+                _search_root_move, move, player, depth, self.deadline, position
+            )
+            for move in ordered
+        ]
+        done, pending = wait(futures, timeout=max(self.deadline - time.time(), 0))
+        results = [future.result() for future in futures if future in done]
+        self.nodes += sum(result[2] for result in results)
+        if pending or any(result[0] is None for result in results):
+            for future in pending:
+                future.cancel()
+            raise SearchTimeout
+
+        best_move = None
+        best_value = -float("inf") if player == 1 else float("inf")
+        best_pv = []
+        for move, (value, exact, _, pv) in zip(ordered, results):
+            if exact and (
+                (player == 1 and value > best_value)
+                or (player == -1 and value < best_value)
+            ):
+                best_value, best_move, best_pv = value, move, pv
+        return best_move, best_value, best_pv
+
+    def principal_variation(self, player, first_move, depth):
+        """Восстанавливает главный вариант по лучшим ходам из таблицы транспозиций."""
+        if first_move is None or depth == 0:
+            return []
+        pv = [first_move]
+        self.game_graph.apply_move(*first_move, player)
+        player = -player
+        while len(pv) < depth:
+            entry = self.transposition_table.probe(
+                self.game_graph.position_key(player == 1)
+            )
+            if entry is None or entry[4] is None:
+                break
+            move = entry[4]
+            if not self.game_graph.apply_move(*move, player):
                 break
+            pv.append(move)
+            player = -player
+        for x, y in reversed(pv):
+            self.game_graph.undo_move(x, y)
+        return pv
+
+
+# Поиск в процессе-исполнителе параллельного режима
+_worker = None
+_worker_bound = None
 
-        return best_move
\ No newline at end of file
+
+def _init_worker(game_graph, tt_size, check_interval, shared_bound, options):
+    """Создает в процессе свой алгоритм с копией доски и таблицы транспозиций."""
+    global _worker, _worker_bound
+    _worker = AlphaBetaAlgorithm(
+        game_graph,
+        tt_size=tt_size,
+        check_interval=check_interval,
+        threat_search=False,
+        **options,
+    )
+    _worker_bound = shared_bound
+
+
+def _search_root_move(move, player, depth, deadline, position):
+    """Ищет один ход корня в позиции position = (хэш, камни) с окном по общей
+    границе. Возвращает (оценка, точная ли оценка, число узлов, главный вариант);
+    оценка None — время истекло."""
+    ai = _worker
+    graph = ai.game_graph
+    key, stones = position
+    if graph.hash != key:
+        graph.reset_board()
+        for x, y, stone in stones:
+            graph.apply_move(x, y, stone)
+    # Результат хода не должен зависеть от ходов, которые процесс искал раньше
+    ai.transposition_table.clear()
+    ai.killer_moves = {}
+    ai.history = {1: {}, -1: {}}
+    ai.deadline = deadline
+    ai.root_depth = depth
+    ai.nodes = 0
+    ai.next_check = ai.check_interval
+    with _worker_bound.get_lock():
+        bound = _worker_bound.value
+
+    x, y = move
+    ai.game_graph.apply_move(x, y, player)
+    try:
+        if player == 1:
+            alpha = bound - 1
+            value = ai.alpha_beta(depth - 1, alpha, float("inf"), False)
+            exact = value > alpha
+        else:
+            beta = bound + 1
+            value = ai.alpha_beta(depth - 1, -float("inf"), beta, True)
+            exact = value < beta
+    except SearchTimeout:
+        return None, False, ai.nodes, []
+    finally:
+        ai.game_graph.undo_move(x, y)
+
+    pv = []
+    if exact:
+        with _worker_bound.get_lock():
+            if (player == 1 and value > _worker_bound.value) or (
+                player == -1 and value < _worker_bound.value
+            ):
+                _worker_bound.value = value
+        pv = ai.principal_variation(player, move, depth)
+    return value, exact, ai.nodes, pv
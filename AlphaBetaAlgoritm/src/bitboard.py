@@ -0,0 +1,130 @@
+from src.graph import DIRECTIONS, GameGraph
+
+
+class BitboardGameGraph(GameGraph):
+    """Игра с битовыми досками: камни каждого игрока хранятся в одном целом числе.
+
+    Клетка (x, y) — бит x * stride + y, где stride = board_size + 1: лишний
+    пустой столбец в конце каждой строки не дает линиям переходить через край
+    доски при сдвигах. Сдвиг на shift бит переводит клетку в соседнюю по
+    направлению: 1 — по горизонтали, stride — по вертикали, stride ± 1 — по
+    диагоналям. Проверки пятерок и подсчет линий делаются несколькими
+    битовыми операциями, фронт ходов GameGraph хранится в той же раскладке
+    битов. Интерфейс совпадает с GameGraph, и AlphaBetaAlgorithm работает
+    с ним без изменений. Массив board
+    поддерживается параллельно для вывода доски и проверок ввода."""
+
+    def __init__(
+        self, board_size=20, win_count=5, zobrist_seed=0, frontier_radius=1
+    ):
+        self.stride = board_size + 1
+        self.shifts = [dx * self.stride + dy for dx, dy in DIRECTIONS]
+        self.bits = {1: 0, -1: 0}  # Битовая доска каждого игрока
+        self.board_mask = 0  # Все клетки доски
+        for x in range(board_size):
+            self.board_mask |= ((1 << board_size) - 1) << (x * self.stride)
+
+        # line_masks[d][x][y] — клетки доски линии длины win_count с началом (x, y)
+        self.line_masks = [
+            [
+                [
+                    self._line_mask(x, y, dx, dy, board_size, win_count)
+                    for y in range(board_size)
+                ]
+                for x in range(board_size)
+            ]
+            for dx, dy in DIRECTIONS
+        ]
+        super().__init__(board_size, win_count, zobrist_seed, frontier_radius)
+
+        # start_masks[x][y][d] — начала линий направления d, проходящих через (x, y)
+        self.start_masks = [
+            [[0] * len(DIRECTIONS) for _ in range(board_size)] for _ in range(board_size)
+        ]
+        for x in range(board_size):
+            for y in range(board_size):
+                for d, sx, sy, _, _ in self.lines_through[x][y]:
+                    self.start_masks[x][y][d] |= self.bit(sx, sy)
+
+    def _line_mask(self, x, y, dx, dy, board_size, win_count):
+        """Маска клеток линии, лежащих на доске (клетки за краем пропускаются)."""
+        mask = 0
+        for i in range(win_count):
+            nx, ny = x + i * dx, y + i * dy
+            if 0 <= nx < board_size and 0 <= ny < board_size:
+                mask |= self.bit(nx, ny)
+        return mask
+
+    def bit(self, x, y):
+        """Бит клетки (x, y)."""
+        return 1 << (x * self.stride + y)
+
+    def cell(self, x, y):
+        """Значение клетки: 1, -1 или 0."""
+        bit = self.bit(x, y)
+        if self.bits[1] & bit:
+            return 1
+        if self.bits[-1] & bit:
+            return -1
+        return 0
+
+    def reset_board(self):
+        """Сбрасывает доску в начальное состояние."""
+        self.bits = {1: 0, -1: 0}
+        super().reset_board()
+
+    def _put(self, x, y, value):
+        """Записывает значение в клетку доски и в битовые доски."""
+        bit = self.bit(x, y)
+        self.bits[1] &= ~bit
+        self.bits[-1] &= ~bit
+        if value != 0:
+            self.bits[value] |= bit
+        self.board[x][y] = value
+
+    def _runs(self, bits, shift):
+        """Биты, с которых начинается win_count камней подряд в направлении shift."""
+        runs = bits
+        for i in range(1, self.win_count):
+            runs &= bits >> (i * shift)
+        return runs
+
+    def _line_score(self, x, y, dx, dy):
+        """Оценка линии с началом (x, y) по битовым маскам, равна evaluate_line."""
+        start = self.bit(x, y)
+        if self.bits[1] & start:
+            player = 1
+        elif self.bits[-1] & start:
+            player = -1
+        else:
+            return 0
+        mask = self.line_masks[DIRECTIONS.index((dx, dy))][x][y]
+        opponent = self.bits[-player] & mask
+        if opponent:
+            # Клетки линии идут по возрастанию битов, поэтому до первого чужого
+            # камня лежат все биты маски младше его бита
+            mask &= (opponent & -opponent) - 1
+        count = (self.bits[player] & mask).bit_count()
+        return self.pattern_score(count, mask.bit_count() - count)
+
+    def check_winner(self, player):
+        """Проверяет, есть ли победитель для данного игрока."""
+        bits = self.bits[player]
+        return any(self._runs(bits, shift) for shift in self.shifts)
+
+    def is_winning_move(self, x, y, player):
+        """Проверяет, собирает ли ход (x, y) игрока player линию длины win_count."""
+        bits = self.bits[player] | self.bit(x, y)
+        starts = self.start_masks[x][y]
+        return any(
+            self._runs(bits, shift) & starts[d] for d, shift in enumerate(self.shifts)
+        )
+
+    def _cells(self, bits):
+        """Клетки установленных битов в порядке обхода доски по строкам."""
+        cells = []
+        while bits:
+            low = bits & -bits
+            cells.append(divmod(low.bit_length() - 1, self.stride))
+            bits ^= low
+        return cells
@@ -0,0 +1,182 @@
+import os
+import random
+
+import numpy as np
+
+MAGIC = b"GMKBOOK1"
+# Ключи книги не зависят от zobrist_seed игры, поэтому таблица своя и постоянная
+BOOK_SEED = 20240101
+
+# Заголовок файла и запись таблицы (ключ 0 — пустая ячейка)
+HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("board_size", "<i8"),
+        ("win_count", "<i8"),
+        ("capacity", "<i8"),
+        ("count", "<i8"),
+    ]
+)
+ENTRY = np.dtype([("key", "<u8"), ("move", "<i4"), ("score", "<i4"), ("depth", "<i4")])
+
+
+class Symmetries:
+    """Канонический ключ позиции с учетом 8 симметрий квадратной доски
+    (4 поворота и их отражения): позиции, переходящие друг в друга поворотом
+    или отражением, получают один ключ."""
+
+    def __init__(self, board_size):
+        n = board_size
+        self.board_size = n
+        cells = np.arange(n * n)
+        x, y = cells // n, cells % n
+        # perms[k][cell] — клетка, в которую симметрия k переводит cell
+        perms = []
+        for swap in (False, True):
+            for flip_x in (False, True):
+                for flip_y in (False, True):
+                    a, b = (y, x) if swap else (x, y)
+                    a = n - 1 - a if flip_x else a
+                    b = n - 1 - b if flip_y else b
+                    perms.append(a * n + b)
+        self.perms = np.array(perms)
+        self.inverse = np.argsort(self.perms, axis=1)
+
+        rng = random.Random(BOOK_SEED)
+        # zobrist[0] — крестики, zobrist[1] — нолики
+        self.zobrist = np.array(
+            [[rng.getrandbits(64) for _ in range(n * n)] for _ in range(2)],
+            dtype=np.uint64,
+        )
+        self.side = rng.getrandbits(64)  # Ключ очереди хода крестиков
+
+    def canonical(self, board, player):
+        """Возвращает (ключ, k): наименьший хэш позиции по 8 симметриям и номер
+        симметрии k, на которой он достигается. Ключ учитывает, чей ход."""
+        flat = np.asarray(board).ravel()
+        cells = np.flatnonzero(flat)
+        if len(cells) == 0:
+            return self.side if player == 1 else 1, 0
+        sides = (flat[cells] == -1).astype(np.intp)
+        # hashes[k] — хэш доски, повернутой симметрией k
+        stones = self.zobrist[sides, self.perms[:, cells]]
+        hashes = np.bitwise_xor.reduce(stones, axis=1)
+        k = int(np.argmin(hashes))
+        key = int(hashes[k]) ^ (self.side if player == 1 else 0)
+        return key or 1, k
+
+
+class OpeningBook:
+    def __init__(self, path):
+        """
+        Открывает книгу дебютов — файл с таблицей позиций, отображенный в память.
+
+        Таблица — открытая адресация с линейным пробированием по каноническому
+        ключу позиции; запись хранит лучший ход (в канонической ориентации),
+        оценку и глубину поиска. Файл открывается только для чтения, поэтому
+        любое число процессов может читать одну книгу: страницы файла общие
+        в кэше ОС, и поиск не копирует таблицу. write заменяет файл целиком
+        (os.replace), и уже открытые книги продолжают читать старую версию.
+
+        Параметры:
+        path (str): Путь к файлу, записанному OpeningBook.write.
+
+        Исключения:
+        ValueError: Если файл не является книгой дебютов.
+        """
+        header = np.fromfile(path, dtype=HEADER, count=1)
+        if len(header) == 0 or header[0]["magic"] != MAGIC:
+            raise ValueError(f"{path} не является книгой дебютов")
+        self.path = path
+        self.board_size = int(header[0]["board_size"])
+        self.win_count = int(header[0]["win_count"])
+        self.capacity = int(header[0]["capacity"])
+        self.count = int(header[0]["count"])
+        self.table = np.memmap(
+            path, dtype=ENTRY, mode="r", offset=HEADER.itemsize, shape=(self.capacity,)
+        )
+        self.keys = self.table["key"]
+        self.symmetries = Symmetries(self.board_size)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """Отпускает отображение файла."""
+        self.table = self.keys = None
+
+    def lookup(self, game_graph, player):
+        """
+        Ищет позицию game_graph, в которой ходит player.
+
+        Возвращает:
+        tuple: (ход (x, y), оценка, глубина) или None, если позиции нет в книге.
+        """
+        if (game_graph.board_size, game_graph.win_count) != (
+            self.board_size,
+            self.win_count,
+        ):
+            return None
+        key, k = self.symmetries.canonical(game_graph.board, player)
+        slot = key % self.capacity
+        for _ in range(self.capacity):
+            stored = int(self.keys[slot])
+            if stored == 0:
+                return None
+            if stored == key:
+                entry = self.table[slot]
+                move = int(self.symmetries.inverse[k][entry["move"]])
+                x, y = divmod(move, self.board_size)
+                if game_graph.board[x][y] != 0:
+                    return None  # Совпадение ключей разных позиций
+                return (x, y), int(entry["score"]), int(entry["depth"])
+            slot = (slot + 1) % self.capacity
+        return None
+
+    def entries(self):
+        """Возвращает все записи как словарь {ключ: (ход, оценка, глубина)}."""
+        used = self.table[self.keys != 0]
+        return {
+            key: (move, score, depth)
+            for key, move, score, depth in zip(
+                used["key"].tolist(),
+                used["move"].tolist(),
+                used["score"].tolist(),
+                used["depth"].tolist(),
+            )
+        }
+
+    @staticmethod
+    def record(entries, symmetries, board, player, move, score, depth):
+        """
+        Добавляет в словарь entries позицию board с ходом player move (x, y).
+        Запись с меньшей глубиной поиска заменяется, с большей — сохраняется.
+        """
+        key, k = symmetries.canonical(board, player)
+        old = entries.get(key)
+        if old is None or old[2] <= depth:
+            cell = move[0] * symmetries.board_size + move[1]
+            entries[key] = (int(symmetries.perms[k][cell]), int(score), int(depth))
+
+    @staticmethod
+    def write(path, board_size, win_count, entries, load_factor=0.5):
+        """
+        Записывает книгу из словаря entries {ключ: (ход, оценка, глубина)}
+        (как возвращают entries() и заполняет record). Файл сначала пишется
+        рядом и затем атомарно заменяет старый.
+        """
+        capacity = max(int(len(entries) / load_factor), 16)
+        table = np.zeros(capacity, dtype=ENTRY)
+        for key, (move, score, depth) in entries.items():
+            slot = key % capacity
+            while table[slot]["key"] != 0:
+                slot = (slot + 1) % capacity
+            table[slot] = (key, move, score, depth)
+        header = np.array(
+            [(MAGIC, board_size, win_count, capacity, len(entries))], dtype=HEADER
+        )
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(header.tobytes())
+            file.write(table.tobytes())
+        os.replace(temporary, path)
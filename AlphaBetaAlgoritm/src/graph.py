@@ -1,21 +1,181 @@
+import random
+
 import numpy as np
 
+# Направления линий: вертикаль, горизонталь и две диагонали
+DIRECTIONS = [(1, 0), (0, 1), (1, 1), (1, -1)]
+
+# Оценка выигранной позиции: больше любой суммы оценок линий, поэтому
+# эвристическая оценка не может с ней совпасть
+WIN = 1000000
+
 
 class GameGraph:
-    def __init__(self, board_size=20, win_count=5):
-        """Инициализация игры с заданным размером доски и количеством символов для победы."""
+    def __init__(
+        self, board_size=20, win_count=5, zobrist_seed=0, frontier_radius=1
+    ):
+        """Инициализация игры с заданным размером доски и количеством символов для победы.
+        frontier_radius — на каком расстоянии от камней (по любому из 8 направлений)
+        пустые клетки считаются ходами-кандидатами в generate_moves."""
         self.board_size = board_size
         self.win_count = win_count
+        self.frontier_radius = frontier_radius
         self.board = np.zeros(
             (self.board_size, self.board_size), dtype=int
         )  # 0 - пустая клетка, 1 - крестик (X), -1 - нолик (O)
 
+        # Случайные ключи Зобриста для каждой клетки и каждого игрока
+        rng = random.Random(zobrist_seed)
+        self.zobrist = {
+            player: [
+                [rng.getrandbits(64) for _ in range(self.board_size)]
+                for _ in range(self.board_size)
+            ]
+            for player in (1, -1)
+        }
+        self.zobrist_side = rng.getrandbits(64)  # Ключ очереди хода крестиков
+        self.hash = 0  # Хэш текущей позиции, обновляется в apply_move/undo_move
+
+        # Для каждой клетки — линии длины win_count, которые через нее проходят:
+        # (номер направления, начало линии x, y, направление dx, dy)
+        self.lines_through = [
+            [
+                [
+                    (d, x - i * dx, y - i * dy, dx, dy)
+                    for d, (dx, dy) in enumerate(DIRECTIONS)
+                    for i in range(self.win_count)
+                    if 0 <= x - i * dx < self.board_size
+                    and 0 <= y - i * dy < self.board_size
+                ]
+                for y in range(self.board_size)
+            ]
+            for x in range(self.board_size)
+        ]
+
+        # Фронт ходов хранится битовыми масками (клетка (x, y) — бит self.bit(x, y)):
+        # neighborhoods[x][y] — клетки на расстоянии не больше frontier_radius от (x, y)
+        self.all_cells = 0
+        for x in range(self.board_size):
+            for y in range(self.board_size):
+                self.all_cells |= self.bit(x, y)
+        self.neighborhoods = [
+            [self._neighborhood(x, y) for y in range(self.board_size)]
+            for x in range(self.board_size)
+        ]
+        self.rebuild_scores()
+
+    def _neighborhood(self, x, y):
+        """Маска клеток на расстоянии не больше frontier_radius от (x, y), без нее самой."""
+        radius = self.frontier_radius
+        mask = 0
+        for nx in range(max(x - radius, 0), min(x + radius + 1, self.board_size)):
+            for ny in range(max(y - radius, 0), min(y + radius + 1, self.board_size)):
+                if (nx, ny) != (x, y):
+                    mask |= self.bit(nx, ny)
+        return mask
+
+    def bit(self, x, y):
+        """Бит клетки (x, y) в масках фронта ходов."""
+        return 1 << (x * self.board_size + y)
+
     def reset_board(self):
         """Сбрасывает доску в начальное состояние."""
         self.board.fill(0)
+        self.hash = 0
+        self.rebuild_scores()
+
+    def rebuild_scores(self):
+        """Пересчитывает с нуля оценки линий, общую оценку, счетчики пятерок и фронт
+        ходов. Нужен только если доска менялась в обход apply_move/undo_move."""
+        self.rebuild_frontier()
+        # line_scores[d][x][y] — оценка evaluate_line линии с началом (x, y) в направлении d
+        self.line_scores = [
+            [[0] * self.board_size for _ in range(self.board_size)]
+            for _ in DIRECTIONS
+        ]
+        self.score = 0  # Сумма оценок всех линий, равна evaluate_board()
+        self.five_counts = {1: 0, -1: 0}  # Количество пятерок в ряд у каждого игрока
+        for x in range(self.board_size):
+            for y in range(self.board_size):
+                for d, (dx, dy) in enumerate(DIRECTIONS):
+                    self._add_line(d, x, y, dx, dy)
+
+    def rebuild_frontier(self):
+        """Пересчитывает с нуля занятые клетки и фронт ходов по доске."""
+        self.occupied = 0  # Маска занятых клеток
+        for x in range(self.board_size):
+            for y in range(self.board_size):
+                if self.board[x][y] != 0:
+                    self.occupied |= self.bit(x, y)
+        self.near_stack = []  # (x, y, near до хода) для каждого хода apply_move
+        self.near = self._near_stones()
+
+    def _near_stones(self):
+        """Маска клеток на расстоянии не больше frontier_radius от какого-либо камня."""
+        near = 0
+        for x, y in self._cells(self.occupied):
+            near |= self.neighborhoods[x][y]
+        return near
+
+    def _line_score(self, x, y, dx, dy):
+        """Оценка линии с началом (x, y): считается для игрока, чей камень стоит в начале."""
+        player = self.board[x][y]
+        if player == 0:
+            return 0
+        return self.evaluate_line(x, y, dx, dy, player)
+
+    def _add_line(self, d, x, y, dx, dy):
+        """Пересчитывает оценку линии и добавляет ее в общую оценку."""
+        value = self._line_score(x, y, dx, dy)
+        self.line_scores[d][x][y] = value
+        self.score += value
+        if value == 10000:
+            self.five_counts[int(self.board[x][y])] += 1
+
+    def _remove_line(self, d, x, y):
+        """Вычитает сохраненную оценку линии из общей оценки."""
+        value = self.line_scores[d][x][y]
+        self.score -= value
+        if value == 10000:
+            self.five_counts[int(self.board[x][y])] -= 1
+
+    def _set_cell(self, x, y, value):
+        """Меняет клетку и обновляет оценки всех линий, проходящих через нее."""
+        lines = self.lines_through[x][y]
+        for d, sx, sy, _, _ in lines:
+            self._remove_line(d, sx, sy)
+        self._put(x, y, value)
+        for d, sx, sy, dx, dy in lines:
+            self._add_line(d, sx, sy, dx, dy)
+
+    def _put(self, x, y, value):
+        """Записывает значение в клетку доски."""
+        self.board[x][y] = value
 
     def check_winner(self, player):
         """Проверяет, есть ли победитель для данного игрока."""
+        return self.five_counts[player] > 0
+
+    def is_winning_move(self, x, y, player):
+        """Проверяет, собирает ли ход (x, y) игрока player линию длины win_count.
+        Смотрит только четыре линии, проходящие через клетку хода."""
+        for dx, dy in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                nx, ny = x + sign * dx, y + sign * dy
+                while (
+                    0 <= nx < self.board_size
+                    and 0 <= ny < self.board_size
+                    and self.board[nx][ny] == player
+                ):
+                    count += 1
+                    nx, ny = nx + sign * dx, ny + sign * dy
+            if count >= self.win_count:
+                return True
+        return False
+
+    def scan_winner(self, player):
+        """Проверяет победителя полным обходом доски (без кэша оценок)."""
         for x in range(self.board_size):
             for y in range(self.board_size):
                 if self.board[x][y] == player:
@@ -42,64 +202,65 @@ class GameGraph:
         return count == self.win_count
 
     def generate_moves(self):
-        """Возвращает список всех доступных ходов (пустых клеток)."""
-        moves = []
-        for x in range(self.board_size):
-            for y in range(self.board_size):
-                if self.board[x][y] == 0:
-                    # Добавляем только клетки, которые находятся рядом с занятыми
-                    if any(
-                        0 <= x + dx < self.board_size
-                        and 0 <= y + dy < self.board_size
-                        and self.board[x + dx][y + dy] != 0
-                        for dx, dy in [
-                            (-1, 0),
-                            (1, 0),
-                            (0, -1),
-                            (0, 1),
-                            (-1, -1),
-                            (-1, 1),
-                            (1, -1),
-                            (1, 1),
-                        ]
-                    ):
-                        moves.append((x, y))
-        return (
-            moves
-            if moves
-            else [
-                (x, y)
-                for x in range(self.board_size)
-                for y in range(self.board_size)
-                if self.board[x][y] == 0
-            ]
-        )
+        """Возвращает список всех доступных ходов (пустых клеток) по строкам доски.
+        Фронт ходов поддерживается в apply_move/undo_move, поэтому здесь только
+        читаются маски."""
+        empty = self.all_cells & ~self.occupied
+        # Только клетки рядом с занятыми, а на пустой доске — все клетки
+        return self._cells(self.near & empty or empty)
+
+    def _cells(self, bits):
+        """Клетки установленных битов в порядке обхода доски по строкам."""
+        cells = []
+        while bits:
+            low = bits & -bits
+            cells.append(divmod(low.bit_length() - 1, self.board_size))
+            bits ^= low
+        return cells
 
     def apply_move(self, x, y, player):
         """Применяет ход для игрока (1 для крестика, -1 для нолика)."""
         if self.board[x][y] == 0:  # Проверка, что клетка пуста
-            self.board[x][y] = player
+            self._set_cell(x, y, player)
+            self.hash ^= self.zobrist[player][x][y]
+            self.occupied |= self.bit(x, y)
+            self.near_stack.append((x, y, self.near))
+            self.near |= self.neighborhoods[x][y]
             return True
         return False
 
     def undo_move(self, x, y):
         """Отменяет ход, ставя клетку в начальное состояние (0)."""
-        self.board[x][y] = 0
+        player = int(self.board[x][y])
+        if player != 0:
+            self.hash ^= self.zobrist[player][x][y]
+            self._set_cell(x, y, 0)
+            self.occupied &= ~self.bit(x, y)
+            if self.near_stack and self.near_stack[-1][:2] == (x, y):
+                self.near = self.near_stack.pop()[2]
+            else:
+                # Ход отменяется не в обратном порядке — фронт считается заново
+                self.near_stack.clear()
+                self.near = self._near_stones()
+
+    def position_key(self, maximizing_player):
+        """Ключ позиции для таблицы транспозиций с учетом очереди хода."""
+        return self.hash ^ self.zobrist_side if maximizing_player else self.hash
 
     def evaluate(self):
         """Оценка состояния доски:
-        - 100 если выиграл крестик
-        - -100 если выиграл нолик
-        - 0 если нет победителя.
+        - WIN если выиграл крестик
+        - -WIN если выиграл нолик
+        - сумма оценок линий, если победителя нет.
         """
-        if self.check_winner(1):  # Крестики
-            return 100
-        elif self.check_winner(-1):  # Нолики
-            return -100
-        return self.evaluate_board()
+        if self.five_counts[1]:  # Крестики
+            return WIN
+        elif self.five_counts[-1]:  # Нолики
+            return -WIN
+        return self.score
 
     def evaluate_board(self):
-        """Оценка доски для определения выгодных позиций."""
+        """Оценка доски для определения выгодных позиций (полный пересчет, равен self.score)."""
         score = 0
         directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
 
@@ -124,7 +285,21 @@ class GameGraph:
                     open_ends += 1
                 else:
                     break
+        return self.pattern_score(count, open_ends)
+
+    def move_score(self, x, y, player):
+        """Статическая оценка пустой клетки (x, y) для упорядочивания ходов: на сколько
+        ход player изменит сумму оценок линий (evaluate_line) в его пользу.
+        Пересчитываются только линии через клетку, общая оценка не меняется."""
+        lines = self.lines_through[x][y]
+        before = sum(self.line_scores[d][sx][sy] for d, sx, sy, _, _ in lines)
+        self._put(x, y, player)
+        after = sum(self._line_score(sx, sy, dx, dy) for _, sx, sy, dx, dy in lines)
+        self._put(x, y, 0)
+        return player * (after - before)
 
+    def pattern_score(self, count, open_ends):
+        """Оценка линии по числу своих камней и пустых клеток до первого чужого камня."""
         if count == self.win_count:
             return 10000  # Победа
         elif count == 4 and open_ends > 0:
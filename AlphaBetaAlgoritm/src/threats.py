@@ -0,0 +1,173 @@
+class ThreatBudgetExceeded(Exception):
+    """Поиск угроз исчерпал свой бюджет узлов."""
+
+
+class ThreatSolver:
+    """Поиск выигрыша непрерывными четверками (VCF) для GameGraph.
+
+    Атакующий делает только ходы-угрозы: после хода в одном из окон длины
+    win_count у него не хватает одного камня до победы, а чужих камней в окне
+    нет. Такой ход берется только из окон, где уже стоят win_count - 2 его
+    камня и нет чужих, поэтому ходов мало. Ответ защитника вынужден — закрыть
+    единственную выигрышную клетку; если выигрышных клеток две, защититься
+    нельзя. Поэтому найденный выигрыш — точный, а поиск перебирает не всю
+    доску, а только угрозы.
+
+    Поиск ведется на собственной копии доски: для каждого окна хранится число
+    камней каждого игрока, ход меняет счетчики только окон через свою клетку."""
+
+    def __init__(self, game_graph, max_threats=10, node_budget=20000):
+        """
+        game_graph: объект GameGraph (нужны board, board_size, win_count и zobrist)
+        max_threats: сколько угроз подряд может сделать атакующий
+        node_budget: сколько узлов может обработать один вызов solve
+        """
+        self.game_graph = game_graph
+        self.max_threats = max_threats
+        self.node_budget = node_budget
+        self.nodes = 0
+        size = game_graph.board_size
+        self.win_count = game_graph.win_count
+
+        # Окна — все отрезки длины win_count; клетка (x, y) имеет номер x * size + y
+        self.windows = []
+        for x in range(size):
+            for y in range(size):
+                for dx, dy in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                    end_x = x + (self.win_count - 1) * dx
+                    end_y = y + (self.win_count - 1) * dy
+                    if 0 <= end_x < size and 0 <= end_y < size:
+                        self.windows.append(
+                            tuple(
+                                (x + i * dx) * size + y + i * dy
+                                for i in range(self.win_count)
+                            )
+                        )
+        self.windows_through = [[] for _ in range(size * size)]
+        for w, cells in enumerate(self.windows):
+            for cell in cells:
+                self.windows_through[cell].append(w)
+        self.zobrist = {
+            player: [
+                game_graph.zobrist[player][x][y]
+                for x in range(size)
+                for y in range(size)
+            ]
+            for player in (1, -1)
+        }
+
+    def solve(self, player):
+        """
+        Ищет выигрыш непрерывными четверками для player, который сейчас ходит.
+        Глубина растет от одной угрозы до max_threats, поэтому находится самый
+        короткий выигрыш.
+        Возвращает ходы по очереди (атакующий, ответ защитника, ...), последний —
+        победный ход атакующего; None — выигрыша нет или не хватило бюджета.
+        """
+        self.nodes = 0
+        self._load()
+        failed = set()  # (хэш, глубина) позиций без выигрыша
+        size = self.game_graph.board_size
+        try:
+            for threats in range(self.max_threats + 1):
+                sequence = self._attack(player, threats, failed)
+                if sequence is not None:
+                    return [divmod(cell, size) for cell in sequence]
+        except ThreatBudgetExceeded:
+            pass
+        return None
+
+    def _load(self):
+        """Копирует доску и считает камни каждого игрока в каждом окне."""
+        self.cells = self.game_graph.board.ravel().tolist()
+        self.hash = 0
+        self.counts = {1: [0] * len(self.windows), -1: [0] * len(self.windows)}
+        for w, cells in enumerate(self.windows):
+            for cell in cells:
+                if self.cells[cell]:
+                    self.counts[self.cells[cell]][w] += 1
+        for cell, value in enumerate(self.cells):
+            if value:
+                self.hash ^= self.zobrist[value][cell]
+
+    def _place(self, cell, player):
+        """Ставит камень player в клетку cell."""
+        self.cells[cell] = player
+        self.hash ^= self.zobrist[player][cell]
+        counts = self.counts[player]
+        for w in self.windows_through[cell]:
+            counts[w] += 1
+
+    def _remove(self, cell):
+        """Убирает камень из клетки cell."""
+        player = self.cells[cell]
+        self.cells[cell] = 0
+        self.hash ^= self.zobrist[player][cell]
+        counts = self.counts[player]
+        for w in self.windows_through[cell]:
+            counts[w] -= 1
+
+    def _empty_cells(self, player, stones, near=None):
+        """Пустые клетки окон, где у player ровно stones камней и нет чужих
+        (только окна через клетку near, если она задана), по возрастанию номера."""
+        own = self.counts[player]
+        other = self.counts[-player]
+        if near is None:
+            windows = range(len(self.windows))
+        else:
+            windows = self.windows_through[near]
+        found = set()
+        for w in windows:
+            if own[w] == stones and other[w] == 0:
+                found.update(cell for cell in self.windows[w] if self.cells[cell] == 0)
+        return sorted(found)
+
+    def _completes_line(self, cell, player):
+        """Собрана ли линия player в одном из окон через клетку cell."""
+        counts = self.counts[player]
+        return any(counts[w] == self.win_count for w in self.windows_through[cell])
+
+    def _attack(self, attacker, threats, failed):
+        """Ход атакующего: выигрыш не больше чем за threats угроз или None."""
+        self.nodes += 1
+        if self.nodes > self.node_budget:
+            raise ThreatBudgetExceeded
+        wins = self._empty_cells(attacker, self.win_count - 1)
+        if wins:
+            return [wins[0]]
+        if threats == 0 or (self.hash, threats) in failed:
+            return None
+
+        moves = self._empty_cells(attacker, self.win_count - 2)
+        blocks = self._empty_cells(-attacker, self.win_count - 1)
+        if blocks:
+            # У защитника своя четверка: можно только закрыть ее, и то если
+            # закрывающий ход сам создает угрозу
+            if len(blocks) > 1 or blocks[0] not in moves:
+                failed.add((self.hash, threats))
+                return None
+            moves = blocks
+
+        for move in moves:
+            self._place(move, attacker)
+            try:
+                replies = self._empty_cells(attacker, self.win_count - 1, move)
+                if len(replies) > 1:
+                    # Две выигрышные клетки: защитник закроет только одну
+                    return [move, replies[0], replies[1]]
+                if replies:
+                    reply = replies[0]
+                    self._place(reply, -attacker)
+                    try:
+                        # Ответ защитника не должен сам собрать линию
+                        if not self._completes_line(reply, -attacker):
+                            sequence = self._attack(attacker, threats - 1, failed)
+                            if sequence is not None:
+                                return [move, reply] + sequence
+                    finally:
+                        self._remove(reply)
+            finally:
+                self._remove(move)
+
+        failed.add((self.hash, threats))
+        return None
@@ -0,0 +1,66 @@
+# Типы оценок, хранящихся в таблице
+EXACT = 0  # Точная оценка позиции
+LOWER = 1  # Нижняя граница: настоящая оценка не меньше сохраненной
+UPPER = 2  # Верхняя граница: настоящая оценка не больше сохраненной
+
+
+class TranspositionTable:
+    def __init__(self, size=1 << 20):
+        """Таблица транспозиций фиксированного размера, адресуемая хэшем Зобриста."""
+        self.size = size
+        self.entries = [None] * size  # (ключ, глубина, тип, оценка, лучший ход, поколение)
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def clear(self):
+        """Очищает таблицу и счетчики."""
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def new_search(self):
+        """Начинает новый поиск: записи прошлых поисков становятся кандидатами на замену."""
+        self.generation += 1
+
+    def probe(self, key):
+        """Возвращает запись для позиции с ключом key или None."""
+        entry = self.entries[key % self.size]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != key:
+            # Ячейка занята другой позицией с тем же индексом
+            self.collisions += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, flag, value, best_move):
+        """Сохраняет результат поиска.
+        Запись заменяется, если она пуста, принадлежит той же позиции, осталась от
+        прошлого поиска или была получена на меньшей глубине."""
+        index = key % self.size
+        entry = self.entries[index]
+        if (
+            entry is None
+            or entry[0] == key
+            or entry[5] != self.generation
+            or depth >= entry[1]
+        ):
+            self.entries[index] = (key, depth, flag, value, best_move, self.generation)
+            self.stores += 1
+
+    def stats(self):
+        """Возвращает счетчики попаданий, промахов и коллизий."""
+        probes = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }
@@ -0,0 +1,54 @@
+import statistics as st
+import time
+
+from src.graph import NoPathError, load_edge_list
+from src.antAlg import AntColonyOptimizer
+
+
+# Сравнение выбора среди всех соседей (k = None) и списков кандидатов
+# из k ближайших соседей на графе 1000.txt. Кроме пути из main.py берется
+# самый далекий по числу ребер узел, достижимый из 144 (кратчайший путь — 44)
+
+# Параметры алгоритма
+num_ants = 200
+alpha = 2.0
+beta = 0.5
+evaporation_rate = 0.3
+iterations = 10
+routes = [("144", "984"), ("144", "992")]
+runs = 5  # Количество запусков для каждого k
+
+for start, end in routes:
+    for k in [None, 2, 3, 5]:
+        times = []
+        costs = []
+        for run in range(runs):
+            # Каждый запуск начинается с новых феромонов
+            graph = load_edge_list("1000.txt")
+            aco = AntColonyOptimizer(
+                graph,
+                num_ants,
+                alpha,
+                beta,
+                evaporation_rate,
+                iterations,
+                candidates=k,
+                seed=run,
+            )
+            started = time.time()
+            try:
+                for i in range(iterations):
+                    aco.optimize_iteration(start, end)
+            except NoPathError:
+                continue  # Муравьи не нашли путь
+            times.append((time.time() - started) / iterations)
+            costs.append(aco.best_cost)
+
+        if not costs:
+            print(f"{start} -> {end}, k = {k}: путь не найден")
+            continue
+        print(
+            f"{start} -> {end}, k = {k}: {st.mean(times) * 1000:.1f} мс на итерацию, "
+            f"лучшая длина {min(costs)}, средняя {st.mean(costs)}, "
+            f"найден в {len(costs)} из {runs} запусков"
+        )
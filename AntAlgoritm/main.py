@@ -1,16 +1,11 @@
 import matplotlib.pyplot as plt
 
-from src.graph import Graph
+from src.graph import load_edge_list
 from src.antAlg import AntColonyOptimizer
 
 
-file = open("1000.txt")
-# Создаем граф
-graph = Graph()
-
-# Добавляем рёбра
-for line in file.readlines():
-    graph.add_edge(str(line.split()[0]), str(line.split()[1]), int(line.split()[2]))
+# Загружаем граф из файла рёбер
+graph = load_edge_list("1000.txt")
 
 
 # Параметры алгоритма
@@ -19,10 +14,12 @@ alpha = 2.0
 beta = 0.5
 evaporation_rate = 1.3
 iterations = 10
+patience = 5  # Остановка, если лучшая длина не улучшалась 5 итераций подряд
 
-aco = AntColonyOptimizer(graph, num_ants, alpha, beta, evaporation_rate, iterations)
-for i in range(iterations):
-    aco.optimize_iteration("144", "984")
+aco = AntColonyOptimizer(
+    graph, num_ants, alpha, beta, evaporation_rate, iterations, patience=patience
+)
+aco.optimize("144", "984")
 
 x_stack = aco.stack_path.keys()
 y_stack = aco.stack_path.values()
@@ -36,6 +33,7 @@ y_probability = aco.probabilities.values()
 
 print(f"Текущая лучшая длина {aco.best_cost}")
 print(f"Текущий лучший путь {aco.best_path}")
+print(f"Итераций выполнено: {aco.iter}, причина остановки: {aco.stop_reason}")
 
 
 fig, axes = plt.subplots(2, 2, figsize=(12, 10))  # Создаём 2x2 сетку графиков
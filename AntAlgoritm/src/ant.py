@@ -1,80 +1,80 @@
-import random
-
-
 class Ant:
-    def __init__(self, start_node):
+    def __init__(self, start_node, max_backtrack=0):
         """
         Инициализирует муравья с начальной позицией.
 
         Параметры:
         start_node (int/str): Узел, с которого начинает движение муравей.
+        max_backtrack (int): Сколько раз муравей может вернуться на шаг назад
+            из тупика, прежде чем начать путь заново.
 
         Атрибуты:
         start_node (int/str): Начальный узел муравья.
         path (list): Маршрут, пройденный муравьем, начинается с начального узла.
+        edges (list): Номера пройденных ребер в массиве феромонов графа.
+        visited (set): Посещенные узлы (включая тупики, из которых муравей вернулся).
+        backtracks (int): Сколько раз муравей вернулся назад с последнего перезапуска.
+        use_candidates (bool): Выбирать ли сначала среди списков кандидатов (если
+            они включены в TransitionCache); после перезапуска — нет.
         total_cost (float): Общая стоимость (длина) маршрута.
         """
         self.start_node = start_node  # Начальная позиция муравья
         self.path = [start_node]  # Маршрут муравья (список узлов)
+        self.edges = []  # Номера пройденных ребер
+        self.visited = {start_node}  # Посещенные узлы
+        self.max_backtrack = max_backtrack
+        self.backtracks = 0
+        self.use_candidates = True
         self.total_cost = 0  # Общая стоимость пройденного пути
 
-    def move(self, graph, alpha, beta):
+    def move(self, transitions):
         """
         Выполняет перемещение муравья в следующий узел на основе вероятностного выбора.
 
+        Если все соседи текущего узла посещены, муравей возвращается на шаг назад
+        (не больше max_backtrack раз), а тупиковый узел остается посещенным, чтобы
+        муравей не вернулся в него снова. Когда возвраты исчерпаны, путь начинается
+        заново, и дальше муравей выбирает среди всех соседей, а не только среди
+        кандидатов: иначе он может раз за разом застревать в той части графа,
+        которая достижима по одним кандидатам, хотя цель достижима.
+
         Параметры:
-        graph (Graph): Граф, содержащий информацию о соседях и феромонах.
-        alpha (float): Влияние феромонов на выбор (чем больше, тем сильнее роль феромонов).
-        beta (float): Влияние расстояния на выбор (чем больше, тем важнее короткий путь).
+        transitions (TransitionCache): Кэш привлекательностей ребер графа
+            (tau^alpha * eta^beta) и их накопленных сумм по узлам.
+
+        Возвращает:
+        bool: True, если муравей застрял (вернулся назад или начал путь заново).
         """
         # Текущий узел муравья (последний узел в его пути)
         current_node = self.path[-1]
 
-        # Получаем список соседей текущего узла (в формате [(сосед, вес), ...])
-        neighbors = graph.get_neighbors(current_node)
-
-        # Фильтруем соседей, которые уже посещены
+        # Выбираем ребро к непосещенному соседу в формате (сосед, вес, номер ребра)
+        edge = transitions.choose(current_node, self.visited, self.use_candidates)
 
-        unvisited_neighbors = [
-            (neighbor, weight)
-            for neighbor, weight in neighbors
-            if neighbor not in self.path
-        ]
+        if edge is None:  # Если нет непосещённых соседей
+            if self.backtracks < self.max_backtrack and len(self.path) > 1:
+                # Возвращаемся в предыдущий узел
+                self.backtracks += 1
+                self.path.pop()
+                self.total_cost -= transitions.graph.weights[self.edges.pop()].item()
+                return True
 
-        if not unvisited_neighbors:  # Если нет непосещённых соседей
             # print(f"Муравей на вершине {current_node} застрял. Перезагружаем путь...")
             self.path = [self.start_node]  # Перезапускаем путь
+            self.edges = []
+            self.visited = {self.start_node}
+            self.backtracks = 0
+            self.use_candidates = False
             self.total_cost = 0
             return True
 
-        # Список вероятностей для каждого соседа
-        probabilities = []
-        for neighbor, weight in unvisited_neighbors:
-            # Уровень феромонов на ребре (current_node, neighbor)
-            pheromone = graph.pheromone.get((current_node, neighbor), 1.0)
-            # Вычисляем вероятность выбора этого соседа:
-            # - pheromone ** alpha: роль феромонов
-            # - (1 / weight) ** beta: роль обратного расстояния (чем меньше расстояние, тем лучше)
-            probability = (pheromone**alpha) * ((1 / weight) ** beta)
-            probabilities.append(probability)
-
-        # Нормализуем вероятности, чтобы их сумма равнялась 1
-        total = sum(probabilities)
-        probabilities = [p / total for p in probabilities]
-
-
-        # Случайно выбираем следующий узел с учетом нормализованных вероятностей
-        next_node = random.choices(
-            [neighbor for neighbor, _ in unvisited_neighbors],  # Список соседей
-            weights=probabilities,  # Соответствующие вероятности
-        )[0]
-
-        # Стоимость следующего узла
-        next_cost = dict(unvisited_neighbors)[next_node]
+        next_node, next_cost, next_edge = edge
 
         # Обновляем маршрут муравья (добавляем следующий узел)
         self.path.append(next_node)
+        self.edges.append(next_edge)
+        self.visited.add(next_node)
 
         # Обновляем общую стоимость пути
         self.total_cost += next_cost
-        return probabilities
+        return False
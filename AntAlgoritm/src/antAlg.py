@@ -1,44 +1,168 @@
-import numpy as np
+import json
 import statistics as st
+import time
+
+import numpy as np
 
 from src.ant import Ant
+from src.graph import NoPathError
+from src.metrics import IterationMetrics
+from src.transitions import TransitionCache
 
 
 class AntColonyOptimizer:
     def __init__(
-        self, graph, num_ants, alpha=1.0, beta=2.0, evaporation_rate=0.5, iterations=100
+        self,
+        graph,
+        num_ants,
+        alpha=1.0,
+        beta=2.0,
+        evaporation_rate=0.5,
+        iterations=100,
+        tau_min=None,
+        tau_max=None,
+        max_backtrack=3,
+        candidates=None,
+        patience=None,
+        time_limit=None,
+        min_entropy=None,
+        metrics=True,
+        seed=None,
     ):
         """
         Инициализирует алгоритм муравьиной колонии.
 
+        Феромоны хранятся в массиве по номерам ребер замороженного графа:
+        испарение — одно умножение массива, а феромоны всех муравьев итерации
+        откладываются одной операцией np.add.at.
+
         Параметры:
-        graph (Graph): Граф, по которому будут перемещаться муравьи.
+        graph (Graph/FrozenGraph): Граф, по которому будут перемещаться муравьи;
+            Graph замораживается через freeze(), феромоны хранятся в FrozenGraph.
         num_ants (int): Количество муравьев.
         alpha (float): Влияние уровня феромонов на выбор пути.
         beta (float): Влияние расстояния на выбор пути.
         evaporation_rate (float): Скорость испарения феромонов (0 < evaporation_rate < 1).
         iterations (int): Количество итераций алгоритма.
+        tau_min (float): Нижняя граница уровня феромонов (как в MAX-MIN Ant System),
+            None — без ограничения.
+        tau_max (float): Верхняя граница уровня феромонов, None — без ограничения.
+        max_backtrack (int): Сколько раз муравей может вернуться из тупика на шаг
+            назад, прежде чем начать путь заново.
+        candidates (int): Размер списков кандидатов: муравей выбирает среди k
+            ближайших по весу соседей, а к остальным переходит, только если все
+            кандидаты посещены. None — выбор среди всех соседей.
+        patience (int): optimize останавливается, если лучшая стоимость не
+            улучшалась столько итераций подряд. None — без ограничения.
+        time_limit (float): Ограничение времени работы optimize в секундах.
+        min_entropy (float): optimize останавливается, когда нормированная энтропия
+            феромонов (см. pheromone_entropy) опускается ниже этого порога.
+        metrics (bool/object): Приемник метрик итераций: True — IterationMetrics,
+            False — метрики не собираются (и вероятность лучшего пути, и сумма
+            феромонов не считаются), либо свой объект с методом record().
+        seed (int/np.random.SeedSequence): Зерно генератора случайных чисел.
+            Каждая итерация получает свой поток из SeedSequence (номер итерации
+            добавляется к spawn_key), поэтому одинаковое зерно дает одинаковый
+            результат, в том числе после продолжения с контрольной точки.
 
         Атрибуты:
         best_path (list): Лучший найденный путь.
         best_cost (float): Стоимость (длина) лучшего пути.
+        pheromone (np.ndarray): Уровень феромонов по номерам ребер (общий с графом).
+        transitions (TransitionCache): Привлекательности ребер и их накопленные суммы.
+        metrics (IterationMetrics): Приемник метрик или None.
+        stack_path, iter_path, pheromons_path, probabilities (dict): Истории итераций
+            из IterationMetrics (пустые, если метрики выключены).
+        best_iter (int): Последняя итерация, на которой улучшилась лучшая стоимость.
+        stop_reason (str): Почему optimize остановился: "iterations", "patience",
+            "time_limit" или "entropy".
         """
-        self.graph = graph
+        self.graph = graph.freeze()
+        self.pheromone = self.graph.pheromone_values
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_sequence = seed
+        self.transitions = TransitionCache(
+            self.graph, alpha, beta, candidates=candidates
+        )
         self.num_ants = num_ants
         self.alpha = alpha
         self.beta = beta
         self.evaporation_rate = evaporation_rate
         self.iterations = iterations
+        self.tau_min = tau_min
+        self.tau_max = tau_max
+        self.max_backtrack = max_backtrack
+        self.patience = patience
+        self.time_limit = time_limit
+        self.min_entropy = min_entropy
+        self.reachable = set()  # Пары (start, end), для которых путь уже проверен
+        if metrics is True:
+            metrics = IterationMetrics(iterations)
+        self.metrics = metrics or None
         self.best_path = None
-        self.stack_path = {}
-        self.iter_path = {}
-        self.pheromons_path = {}
-        self.probabilities = {}
         self.probability = []
         self.count = None
         self.iter = 0
         self.pheromone_cost = 0
         self.best_cost = float("inf")  # Начальная стоимость задается как бесконечность
+        self.best_iter = 0
+        self.stop_reason = None
+
+    @property
+    def stack_path(self):
+        return self.history("stack_path")
+
+    @property
+    def iter_path(self):
+        return self.history("iter_path")
+
+    @property
+    def pheromons_path(self):
+        return self.history("pheromons_path")
+
+    @property
+    def probabilities(self):
+        return self.history("probabilities")
+
+    def history(self, name):
+        """Возвращает историю name как словарь {номер итерации: значение}."""
+        if not isinstance(self.metrics, IterationMetrics):
+            return {}
+        return self.metrics.history(name)
+
+    def optimize(self, start, end):
+        """
+        Выполняет итерации, пока их общее число не достигнет iterations или
+        не сработает одно из правил остановки (patience, time_limit, min_entropy).
+        После загрузки контрольной точки продолжает с сохраненной итерации.
+
+        Параметры:
+        start (int/str): Стартовый узел.
+        end (int/str): Конечный узел.
+
+        Возвращает:
+        str: Причина остановки (также сохраняется в stop_reason).
+        """
+        started = time.time()
+        self.stop_reason = "iterations"
+        while self.iter < self.iterations:
+            self.optimize_iteration(start, end)
+            stalled = self.iter - self.best_iter
+            if self.patience is not None and stalled >= self.patience:
+                self.stop_reason = "patience"
+                break
+            elapsed = time.time() - started
+            if self.time_limit is not None and elapsed >= self.time_limit:
+                self.stop_reason = "time_limit"
+                break
+            if (
+                self.min_entropy is not None
+                and self.pheromone_entropy() < self.min_entropy
+            ):
+                self.stop_reason = "entropy"
+                break
+        return self.stop_reason
 
     def optimize_iteration(self, start, end):
         """
@@ -47,103 +171,218 @@ class AntColonyOptimizer:
         Параметры:
         start (int/str): Стартовый узел.
         end (int/str): Конечный узел.
+
+        Исключения:
+        NoPathError: Если из start в end нет пути или муравьи не нашли его
+            за num_ants * 10000 застреваний.
         """
+        self.check_path(start, end)
+
         # Создаем муравьев, каждый начинает путь с узла start
-        ants = [Ant(start) for _ in range(self.num_ants)]
+        ants = [Ant(start, self.max_backtrack) for _ in range(self.num_ants)]
         self.count = 0
         self.iter += 1
+        previous_cost = self.best_cost
+        self.transitions.use_generator(self.iteration_generator(self.iter))
+        best_ant = None
 
         for ant in ants:
             # Пока муравей не достиг конечного узла, он перемещается
             while ant.path[-1] != end:
-                flag = ant.move(self.graph, self.alpha, self.beta)
+                flag = ant.move(self.transitions)
 
                 if flag == True:
                     self.count += 1
 
                 if self.count > len(ants) * 10000:
-                    print(
-                        f"Нет Гамельтонова цикла, потому что из {start} в {end} нет пути"
+                    raise NoPathError(
+                        f"Муравьи не нашли путь из {start} в {end} "
+                        f"за {self.count} застреваний"
                     )
-                    exit(0)
 
             # Проверяем, является ли маршрут этого муравья лучшим
             if ant.total_cost <= self.best_cost:
                 self.best_cost = ant.total_cost
-                self.best_path = ant.path
-                self.best_path_probability()
+                best_ant = ant
 
-            # Обновляем феромоны по маршруту муравья
-            self.pheromone_cost = self.update_pheromone(ant, self.pheromone_cost)
+        if best_ant is not None:
+            self.best_path = best_ant.path
+            # Феромоны внутри итерации не меняются, поэтому вероятность лучшего
+            # пути достаточно посчитать один раз, до откладывания феромонов
+            if self.metrics is not None:
+                self.best_path_probability()
 
-        self.pheromons_path[self.iter] = self.pheromone_cost
+        # Обновляем феромоны по маршрутам всех муравьев итерации
+        self.update_pheromone(ants)
 
         # Испаряем феромоны, чтобы избежать их чрезмерного накопления
         self.evaporate_pheromone()
-        if st.median(self.probability) < 1 - st.median(self.probability):
-            self.probabilities[self.iter] = 1 - st.median(self.probability)
-        else:
-            self.probabilities[self.iter] = st.median(self.probability)
 
-        self.stack_path[self.iter] = self.count
-        self.iter_path[self.iter] = self.best_cost
+        if self.metrics is not None:
+            median = st.median(self.probability) if self.probability else float("nan")
+            self.metrics.record(
+                self.iter,
+                self.count,
+                self.best_cost,
+                self.pheromone_cost,
+                max(median, 1 - median),
+            )
+        if self.best_cost < previous_cost:
+            self.best_iter = self.iter
 
-    def update_pheromone(self, ant, pheromone_cost):
+    def iteration_generator(self, iteration):
         """
-        Добавляет феромоны на маршруте, пройденном муравьем.
+        Возвращает генератор случайных чисел итерации с номером iteration —
+        потомок seed_sequence с номером итерации в spawn_key.
+        """
+        seed = self.seed_sequence
+        child = np.random.SeedSequence(
+            seed.entropy, spawn_key=(*seed.spawn_key, iteration)
+        )
+        return np.random.default_rng(child)
+
+    def pheromone_entropy(self):
+        """
+        Возвращает энтропию распределения феромонов по ребрам, деленную на
+        максимально возможную (log числа ребер): 1 — феромоны распределены
+        равномерно, около 0 — почти все феромоны на немногих ребрах.
+        """
+        tau = np.abs(self.pheromone)
+        total = tau.sum()
+        if tau.size < 2 or total == 0:
+            return 0.0
+        p = tau[tau > 0] / total
+        return float(-(p * np.log(p)).sum() / np.log(tau.size))
+
+    def save_checkpoint(self, path):
+        """
+        Сохраняет состояние алгоритма в сжатый файл .npz: феромоны, лучший путь,
+        истории итераций и зерно генератора случайных чисел (состояние генератора
+        определяется зерном и номером итерации). Остальные параметры алгоритма
+        не сохраняются — их задает конструктор при продолжении.
 
         Параметры:
-        ant (Ant): Объект муравья, для которого обновляются феромоны.
+        path (str): Путь к файлу.
+        """
+        seed = self.seed_sequence
+        histories = {}
+        if isinstance(self.metrics, IterationMetrics):
+            histories = self.metrics.arrays()
+        np.savez_compressed(
+            path,
+            pheromone=self.pheromone,
+            # Путь хранится номерами узлов: имена могут быть не строками
+            best_path=np.array(
+                [self.graph.node_ids[node] for node in self.best_path or []],
+                dtype=np.int64,
+            ),
+            has_best_path=self.best_path is not None,
+            counters=np.array(
+                [self.iter, self.best_iter, self.count or 0], dtype=np.int64
+            ),
+            costs=np.array([self.best_cost, self.pheromone_cost], dtype=float),
+            probability=np.array(self.probability, dtype=float),
+            # Энтропия SeedSequence может быть больше 64 бит, поэтому хранится текстом
+            seed=json.dumps([seed.entropy, list(seed.spawn_key)]),
+            **histories,
+        )
+
+    def load_checkpoint(self, path):
+        """
+        Восстанавливает состояние, сохраненное save_checkpoint. Алгоритм должен
+        быть создан для того же графа; после загрузки optimize продолжает с
+        сохраненной итерации.
+
+        Параметры:
+        path (str): Путь к файлу.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            if data["pheromone"].shape != self.pheromone.shape:
+                raise ValueError(
+                    f"{path}: контрольная точка сохранена для другого графа"
+                )
+            self.pheromone[:] = data["pheromone"]
+            self.transitions.invalidate()
+            labels = self.graph.labels
+            self.best_path = (
+                [labels[node] for node in data["best_path"].tolist()]
+                if data["has_best_path"]
+                else None
+            )
+            self.iter, self.best_iter, self.count = data["counters"].tolist()
+            self.best_cost, self.pheromone_cost = data["costs"].tolist()
+            if isinstance(self.metrics, IterationMetrics) and "stack_path" in data:
+                self.metrics.load({name: data[name] for name in IterationMetrics.names})
+            self.probability = data["probability"].tolist()
+            entropy, spawn_key = json.loads(data["seed"].item())
+            self.seed_sequence = np.random.SeedSequence(
+                entropy, spawn_key=tuple(spawn_key)
+            )
+
+    def check_path(self, start, end):
         """
-        for i in range(len(ant.path) - 1):
-            u = ant.path[i]
-            v = ant.path[i + 1]
+        Проверяет обходом в ширину, что из start можно дойти до end
+        (один раз для каждой пары узлов).
 
-            # Убедимся, что ребро присутствует в словаре феромонов
-            if (u, v) not in self.graph.pheromone:
-                self.graph.pheromone[(u, v)] = 1.0
-            # Для семмитричного графа
-            # if (v, u) not in self.graph.pheromone:
-            #     self.graph.pheromone[(v, u)] = 1.0
+        Исключения:
+        NoPathError: Если пути нет.
+        """
+        if (start, end) in self.reachable:
+            return
+        if not self.graph.has_path(start, end):
+            raise NoPathError(
+                f"Нет Гамельтонова цикла, потому что из {start} в {end} нет пути"
+            )
+        self.reachable.add((start, end))
+
+    def update_pheromone(self, ants):
+        """
+        Добавляет феромоны на маршрутах, пройденных муравьями, одной операцией.
+        Если метрики включены, добавляет к pheromone_cost сумму феромонов
+        на пройденных ребрах.
 
-            # Увеличиваем уровень феромонов, пропорционально обратной стоимости маршрута
-            self.graph.pheromone[(u, v)] += 1.0 / ant.total_cost
-            # self.graph.pheromone[(v, u)] += 1.0 / ant.total_cost  # Для симметричных графов
-            pheromone_cost += self.graph.pheromone[(u, v)]
-        return pheromone_cost
+        Параметры:
+        ants (list): Муравьи итерации, дошедшие до конечного узла.
+        """
+        walked = np.fromiter(
+            (edge for ant in ants for edge in ant.edges),
+            dtype=np.int64,
+            count=sum(len(ant.edges) for ant in ants),
+        )
+        # Каждому ребру маршрута — феромоны, обратно пропорциональные его стоимости
+        with np.errstate(divide="ignore"):
+            deposit = np.repeat(
+                1.0 / np.array([ant.total_cost for ant in ants], dtype=float),
+                [len(ant.edges) for ant in ants],
+            )
+        np.add.at(self.pheromone, walked, deposit)
+        self.transitions.invalidate(walked)
+        self.clamp_pheromone()
+        if self.metrics is not None:
+            self.pheromone_cost += self.pheromone[walked].sum().item()
 
     def evaporate_pheromone(self):
         """
         Испаряет часть феромонов на всех ребрах графа, уменьшая их уровни.
         """
-        for edge in self.graph.pheromone:
-            # Уменьшаем уровень феромонов на ребре с учетом коэффициента испарения
-            self.graph.pheromone[edge] *= 1 - self.evaporation_rate
+        # Вероятности перехода от общего множителя не меняются, кэш остается верным
+        self.pheromone *= 1 - self.evaporation_rate
+        self.clamp_pheromone()
+
+    def clamp_pheromone(self):
+        """
+        Ограничивает уровни феромонов отрезком [tau_min, tau_max], если границы заданы.
+        """
+        if self.tau_min is not None or self.tau_max is not None:
+            np.clip(self.pheromone, self.tau_min, self.tau_max, out=self.pheromone)
+            self.transitions.invalidate()
 
     def best_path_probability(self):
-        best_path = 0
-        self.probability = []
-        for i in range(len(self.best_path) - 1):
-            probabilities = []
-            u = self.best_path[i]
-            v = self.best_path[i + 1]
-            neighbors = self.graph.get_neighbors(u)
-            for neighbor, weight in neighbors:
-                if neighbor != v:
-                    # Уровень феромонов на ребре (current_node, neighbor)
-                    pheromone = self.graph.pheromone.get((u, neighbor), 1.0)
-                    # Вычисляем вероятность выбора этого соседа:
-                    # - pheromone ** alpha: роль феромонов
-                    # - (1 / weight) ** beta: роль обратного расстояния (чем меньше расстояние, тем лучше)
-                    probability = (pheromone**self.alpha) * ((1 / weight) ** self.beta)
-                    probabilities.append(probability)
-                else:
-                    pheromone = self.graph.pheromone.get((u, neighbor), 1.0)
-                    # Вычисляем вероятность выбора этого соседа:
-                    # - pheromone ** alpha: роль феромонов
-                    # - (1 / weight) ** beta: роль обратного расстояния (чем меньше расстояние, тем лучше)
-                    probability = (pheromone**self.alpha) * ((1 / weight) ** self.beta)
-                    best_path = probability
-
-            total = sum(probabilities) + best_path
-            self.probability.append(best_path / total)
+        """
+        Считает вероятность выбора каждого ребра лучшего пути среди всех
+        ребер, выходящих из того же узла.
+        """
+        self.probability = [
+            self.transitions.probability(u, v)
+            for u, v in zip(self.best_path, self.best_path[1:])
+        ]
@@ -1,3 +1,14 @@
+import mmap
+import os
+from collections.abc import MutableMapping
+
+import numpy as np
+
+
+class NoPathError(Exception):
+    """Между стартовым и конечным узлами нет пути."""
+
+
 class Graph:
     def __init__(self):
         """
@@ -49,3 +60,297 @@ class Graph:
         list[tuple]: Список соседей в формате (сосед, вес ребра).
         """
         return self.graph[node]
+
+    def freeze(self):
+        """
+        Строит компактную неизменяемую копию графа в формате CSR.
+
+        Возвращает:
+        FrozenGraph: Граф с числовыми номерами узлов, массивами indptr/indices/weights
+        и массивом феромонов по номерам ребер (значения берутся из self.pheromone).
+        """
+        labels = list(self.graph)
+        node_ids = {label: i for i, label in enumerate(labels)}
+        num_edges = sum(len(edges) for edges in self.graph.values())
+
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(self.graph[u]) for u in labels])
+        edges = [(u, v, weight) for u in labels for v, weight in self.graph[u]]
+        indices = np.fromiter(
+            (node_ids[v] for _, v, _ in edges), dtype=np.int32, count=num_edges
+        )
+        weights = np.fromiter(
+            (weight for _, _, weight in edges), dtype=float, count=num_edges
+        )
+        pheromone = np.fromiter(
+            (self.pheromone.get((u, v), 1.0) for u, v, _ in edges),
+            dtype=float,
+            count=num_edges,
+        )
+        return FrozenGraph(labels, indptr, indices, weights, pheromone)
+
+
+class FrozenGraph:
+    def __init__(self, labels, indptr, indices, weights, pheromone=None):
+        """
+        Инициализирует неизменяемый граф в формате CSR.
+        Соседи узла с номером i — indices[indptr[i]:indptr[i + 1]], веса ребер
+        лежат в weights по тем же позициям, а позиция ребра служит его номером.
+
+        Параметры:
+        labels (list): Имена узлов по их числовым номерам.
+        indptr (np.ndarray): Границы списков соседей, длина — число узлов + 1.
+        indices (np.ndarray): Номера соседей для всех ребер подряд.
+        weights (np.ndarray): Веса ребер.
+        pheromone (np.ndarray): Начальный уровень феромонов по номерам ребер (по умолчанию 1.0).
+
+        Атрибуты:
+        node_ids (dict): Номер узла по его имени.
+        pheromone_values (np.ndarray): Уровень феромонов по номерам ребер.
+        pheromone (PheromoneView): Доступ к феромонам по парам узлов (u, v), как в Graph.
+        """
+        self.labels = list(labels)
+        self.node_ids = {label: i for i, label in enumerate(self.labels)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=float)
+        if pheromone is None:
+            pheromone = np.ones(len(self.indices), dtype=float)
+        self.pheromone_values = np.asarray(pheromone, dtype=float)
+        self.pheromone = PheromoneView(self)
+        self._edges = {}
+
+    @property
+    def num_nodes(self):
+        return len(self.labels)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def freeze(self):
+        """Граф уже заморожен, поэтому возвращается он сам."""
+        return self
+
+    def degree(self, node_id):
+        """Возвращает количество исходящих ребер узла с номером node_id."""
+        return int(self.indptr[node_id + 1] - self.indptr[node_id])
+
+    def edge_id(self, u, v):
+        """
+        Возвращает номер ребра (u, v) по именам узлов или None, если ребра нет.
+        Для параллельных ребер возвращается первое из них.
+        """
+        u_id = self.node_ids.get(u)
+        v_id = self.node_ids.get(v)
+        if u_id is None or v_id is None:
+            return None
+        begin, end = self.indptr[u_id], self.indptr[u_id + 1]
+        found = np.flatnonzero(self.indices[begin:end] == v_id)
+        return int(begin + found[0]) if found.size else None
+
+    def has_path(self, u, v):
+        """
+        Проверяет обходом в ширину, достижим ли узел v из узла u.
+        Фронт обхода обрабатывается целиком операциями NumPy.
+
+        Параметры:
+        u (int/str): Стартовый узел.
+        v (int/str): Конечный узел.
+
+        Возвращает:
+        bool: True, если путь есть (в том числе при u == v).
+        """
+        start = self.node_ids.get(u)
+        end = self.node_ids.get(v)
+        if start is None or end is None:
+            return False
+        seen = np.zeros(self.num_nodes, dtype=bool)
+        seen[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        while frontier.size and not seen[end]:
+            begins = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - begins
+            # Номера всех ребер, выходящих из узлов фронта
+            offsets = np.repeat(begins - np.cumsum(counts) + counts, counts)
+            neighbors = self.indices[offsets + np.arange(counts.sum())]
+            frontier = np.unique(neighbors[~seen[neighbors]]).astype(np.int64)
+            seen[frontier] = True
+        return bool(seen[end])
+
+    def get_edges(self, node):
+        """
+        Возвращает исходящие ребра узла вместе с их номерами.
+        Списки строятся при первом обращении к узлу и затем переиспользуются.
+
+        Параметры:
+        node (int/str): Узел, для которого необходимо получить список ребер.
+
+        Возвращает:
+        list[tuple]: Список ребер в формате (сосед, вес ребра, номер ребра).
+        """
+        edges = self._edges.get(node)
+        if edges is None:
+            node_id = self.node_ids[node]
+            begin, end = int(self.indptr[node_id]), int(self.indptr[node_id + 1])
+            labels = self.labels
+            edges = [
+                (labels[v], weight, edge)
+                for v, weight, edge in zip(
+                    self.indices[begin:end].tolist(),
+                    self.weights[begin:end].tolist(),
+                    range(begin, end),
+                )
+            ]
+            self._edges[node] = edges
+        return edges
+
+    def get_neighbors(self, node):
+        """
+        Возвращает список соседей для указанного узла.
+
+        Параметры:
+        node (int/str): Узел, для которого необходимо получить список соседей.
+
+        Возвращает:
+        list[tuple]: Список соседей в формате (сосед, вес ребра).
+        """
+        node_id = self.node_ids[node]
+        begin, end = self.indptr[node_id], self.indptr[node_id + 1]
+        labels = self.labels
+        return [
+            (labels[v], weight)
+            for v, weight in zip(
+                self.indices[begin:end].tolist(), self.weights[begin:end].tolist()
+            )
+        ]
+
+
+class PheromoneView(MutableMapping):
+    """
+    Словарь феромонов FrozenGraph с ключами (u, v), как Graph.pheromone.
+    Значения хранятся в массиве pheromone_values по номерам ребер.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, edge):
+        edge_id = self.graph.edge_id(*edge)
+        if edge_id is None:
+            raise KeyError(edge)
+        return self.graph.pheromone_values[edge_id].item()
+
+    def __setitem__(self, edge, value):
+        edge_id = self.graph.edge_id(*edge)
+        if edge_id is None:
+            raise KeyError(edge)
+        self.graph.pheromone_values[edge_id] = value
+
+    def __delitem__(self, edge):
+        raise TypeError("Нельзя удалить ребро из замороженного графа")
+
+    def __iter__(self):
+        graph = self.graph
+        for u_id, u in enumerate(graph.labels):
+            seen = set()
+            for v_id in graph.indices[graph.indptr[u_id] : graph.indptr[u_id + 1]].tolist():
+                if v_id not in seen:
+                    seen.add(v_id)
+                    yield (u, graph.labels[v_id])
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def read_edge_arrays(path, chunk_size=1 << 26):
+    """
+    Читает файл ребер формата "u v w" (разделители — любые пробелы и табуляции).
+    Файл отображается в память и разбирается кусками по chunk_size байт,
+    граница куска сдвигается до ближайшего конца строки.
+
+    Параметры:
+    path (str): Путь к файлу.
+    chunk_size (int): Размер куска в байтах.
+
+    Возвращает:
+    tuple: (sources, targets, weights) — имена узлов как массивы байтовых строк и веса.
+    """
+    sources, targets, weights = [], [], []
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return np.array([], dtype="S1"), np.array([], dtype="S1"), np.array([])
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            begin = 0
+            while begin < len(data):
+                end = min(begin + chunk_size, len(data))
+                if end < len(data):
+                    # Кусок заканчивается на конце строки; если в куске нет ни
+                    # одного конца строки, он продлевается до ближайшего
+                    newline = data.rfind(b"\n", begin, end)
+                    if newline < 0:
+                        newline = data.find(b"\n", end)
+                    end = newline + 1 if newline >= 0 else len(data)
+                tokens = data[begin:end].split()
+                begin = end
+                if len(tokens) % 3:
+                    raise ValueError(
+                        f"{path}: в каждой строке должно быть три поля: u v w"
+                    )
+                tokens = np.array(tokens)
+                sources.append(tokens[0::3])
+                targets.append(tokens[1::3])
+                weights.append(tokens[2::3])
+
+    weights = np.concatenate(weights)
+    try:
+        weights = weights.astype(np.int64)
+    except ValueError:
+        weights = weights.astype(float)
+    return np.concatenate(sources), np.concatenate(targets), weights
+
+
+def load_edge_list(path, cache=False):
+    """
+    Загружает граф из файла ребер "u v w" сразу в FrozenGraph, минуя add_edge.
+
+    Параметры:
+    path (str): Путь к файлу (например, 1000.txt).
+    cache (bool): Сохранять рядом двоичную копию path + ".npz" и при следующих
+        загрузках читать ее, если исходный файл не изменился.
+
+    Возвращает:
+    FrozenGraph: Граф с именами узлов-строками, как при чтении файла через add_edge.
+    """
+    cache_path = path + ".npz"
+    stat = os.stat(path)
+    if cache and os.path.exists(cache_path):
+        with np.load(cache_path) as data:
+            if data["source"].tolist() == [stat.st_size, stat.st_mtime_ns]:
+                return FrozenGraph(
+                    data["labels"].tolist(),
+                    data["indptr"],
+                    data["indices"],
+                    data["weights"],
+                )
+
+    sources, targets, weights = read_edge_arrays(path)
+    # Имена узлов заменяются номерами (узлы идут в порядке сортировки имен)
+    names, ids = np.unique(np.concatenate([sources, targets]), return_inverse=True)
+    source_ids, target_ids = ids[: len(sources)], ids[len(sources) :]
+    order = np.argsort(source_ids, kind="stable")
+    indptr = np.zeros(len(names) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(source_ids, minlength=len(names)))
+    labels = np.char.decode(names).tolist() if len(names) else []
+    graph = FrozenGraph(labels, indptr, target_ids[order], weights[order])
+
+    if cache:
+        np.savez(
+            cache_path,
+            labels=np.array(labels, dtype=str),
+            indptr=graph.indptr,
+            indices=graph.indices,
+            weights=graph.weights,
+            source=np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64),
+        )
+    return graph
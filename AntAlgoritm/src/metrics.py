@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class IterationMetrics:
+    # Имена историй, как у атрибутов AntColonyOptimizer
+    names = ("stack_path", "iter_path", "pheromons_path", "probabilities")
+
+    def __init__(self, capacity=100):
+        """
+        Инициализирует приемник метрик итераций алгоритма муравьиной колонии.
+
+        Метрики пишутся в заранее выделенные массивы по номеру итерации;
+        при переполнении массивы увеличиваются вдвое. Любой объект с методом
+        record(iteration, stuck, best_cost, pheromone_cost, probability) можно
+        передать в AntColonyOptimizer вместо этого класса.
+
+        Параметры:
+        capacity (int): На сколько итераций выделить массивы сразу.
+
+        Атрибуты:
+        size (int): Номер последней записанной итерации.
+        values (dict): Имя истории -> массив значений по итерациям.
+        """
+        capacity = max(capacity, 1)
+        self.size = 0
+        self.values = {
+            "stack_path": np.zeros(capacity, dtype=np.int64),
+            "iter_path": np.zeros(capacity, dtype=float),
+            "pheromons_path": np.zeros(capacity, dtype=float),
+            "probabilities": np.zeros(capacity, dtype=float),
+        }
+
+    def record(self, iteration, stuck, best_cost, pheromone_cost, probability):
+        """
+        Записывает метрики итерации с номером iteration (с единицы).
+
+        Параметры:
+        iteration (int): Номер итерации.
+        stuck (int): Количество застреваний муравьев.
+        best_cost (float): Лучшая стоимость после итерации.
+        pheromone_cost (float): Накопленная сумма феромонов на пройденных ребрах.
+        probability (float): Медианная вероятность выбора ребер лучшего пути.
+        """
+        if iteration > len(self.values["stack_path"]):
+            capacity = max(iteration, 2 * len(self.values["stack_path"]))
+            for name, array in self.values.items():
+                grown = np.zeros(capacity, dtype=array.dtype)
+                grown[: len(array)] = array
+                self.values[name] = grown
+        i = iteration - 1
+        self.values["stack_path"][i] = stuck
+        self.values["iter_path"][i] = best_cost
+        self.values["pheromons_path"][i] = pheromone_cost
+        self.values["probabilities"][i] = probability
+        self.size = max(self.size, iteration)
+
+    def arrays(self):
+        """Возвращает истории как массивы длины size (без копирования)."""
+        return {name: array[: self.size] for name, array in self.values.items()}
+
+    def history(self, name):
+        """Возвращает историю name как словарь {номер итерации: значение}."""
+        return dict(enumerate(self.values[name][: self.size].tolist(), 1))
+
+    def load(self, arrays):
+        """Заменяет записанные метрики историями из arrays (как возвращает arrays())."""
+        for name in self.names:
+            values = np.asarray(arrays[name], dtype=self.values[name].dtype)
+            capacity = max(len(self.values[name]), len(values))
+            array = np.zeros(capacity, dtype=values.dtype)
+            array[: len(values)] = values
+            self.values[name] = array
+        self.size = len(arrays["stack_path"])
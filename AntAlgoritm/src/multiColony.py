@@ -0,0 +1,294 @@
+import multiprocessing
+from multiprocessing import shared_memory
+from threading import BrokenBarrierError
+
+import numpy as np
+
+from src.graph import NoPathError
+from src.vectorAntAlg import VectorizedAntColonyOptimizer
+
+
+class SharedArrays:
+    def __init__(self, layout, name=None):
+        """
+        Набор массивов NumPy в одном блоке общей памяти.
+
+        Параметры:
+        layout (dict): Имя массива -> (форма, тип данных).
+        name (str): Имя существующего блока; None — создать новый блок.
+        """
+        self.layout = layout
+        offsets = {}
+        size = 0
+        for key, (shape, dtype) in layout.items():
+            offsets[key] = size
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            size += (nbytes + 7) // 8 * 8  # Выравнивание по 8 байт
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=self.owner, size=max(size, 8)
+        )
+        self.arrays = {
+            key: np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offsets[key])
+            for key, (shape, dtype) in layout.items()
+        }
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def close(self):
+        """Отключается от блока; создатель блока также удаляет его."""
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class MultiColonyOptimizer:
+    def __init__(
+        self,
+        graph,
+        num_colonies,
+        num_ants,
+        alpha=1.0,
+        beta=2.0,
+        evaporation_rate=0.5,
+        iterations=100,
+        exchange_interval=5,
+        migration_rate=0.1,
+        max_backtrack=3,
+        workers=None,
+        batch_size=None,
+        seed=None,
+    ):
+        """
+        Инициализирует островную модель из нескольких независимых колоний.
+
+        Колонии распределяются по процессам (колония c — процессу c % workers),
+        у каждой свой массив феромонов. Массивы феромонов, лучшие пути и
+        истории всех колоний лежат в общей памяти. Каждые exchange_interval
+        итераций колонии обмениваются опытом: феромоны колонии смешиваются с
+        феромонами предыдущей колонии по кольцу, а на лучший путь всех колоний
+        откладываются феромоны в каждой колонии. Каждая колония — это
+        VectorizedAntColonyOptimizer.
+
+        Параметры:
+        graph (Graph/FrozenGraph): Граф, по которому будут перемещаться муравьи.
+        num_colonies (int): Количество колоний.
+        num_ants (int): Количество муравьев в каждой колонии.
+        alpha (float): Влияние уровня феромонов на выбор пути.
+        beta (float): Влияние расстояния на выбор пути.
+        evaporation_rate (float): Скорость испарения феромонов (0 < evaporation_rate < 1).
+        iterations (int): Количество итераций алгоритма.
+        exchange_interval (int): Через сколько итераций колонии обмениваются феромонами.
+        migration_rate (float): Доля феромонов, которую колония берет у соседней.
+        max_backtrack (int): Сколько раз муравей может вернуться из тупика на шаг
+            назад, прежде чем начать путь заново.
+        workers (int): Количество процессов; по умолчанию — по процессу на колонию,
+            но не больше числа ядер.
+        batch_size (int): Размер волны муравьев внутри колонии.
+        seed (int/np.random.SeedSequence): Зерно генератора случайных чисел. Каждая
+            колония получает свой поток через SeedSequence.spawn, поэтому результат
+            не зависит от числа процессов и распределения колоний по ним.
+
+        Атрибуты:
+        best_path (list): Лучший путь среди всех колоний.
+        best_cost (float): Стоимость (длина) лучшего пути.
+        colony_best_costs (list): Лучшая стоимость каждой колонии.
+        """
+        self.graph = graph.freeze()
+        self.num_colonies = num_colonies
+        self.num_ants = num_ants
+        self.alpha = alpha
+        self.beta = beta
+        self.evaporation_rate = evaporation_rate
+        self.iterations = iterations
+        self.exchange_interval = exchange_interval
+        self.migration_rate = migration_rate
+        self.max_backtrack = max_backtrack
+        self.workers = min(workers or multiprocessing.cpu_count(), num_colonies)
+        self.batch_size = batch_size
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_sequence = seed
+        self.best_path = None
+        self.best_cost = float("inf")
+        self.colony_best_costs = []
+        self.stack_path = {}
+        self.iter_path = {}
+        self.pheromons_path = {}
+        self.probabilities = {}
+
+    def optimize(self, start, end):
+        """
+        Выполняет все итерации во всех колониях и собирает общий результат.
+
+        Параметры:
+        start (int/str): Стартовый узел.
+        end (int/str): Конечный узел.
+
+        Исключения:
+        NoPathError: Если из start в end нет пути.
+        """
+        graph = self.graph
+        # Проверяем до запуска процессов, чтобы не получать ошибку из каждой колонии
+        if not graph.has_path(start, end):
+            raise NoPathError(
+                f"Нет Гамельтонова цикла, потому что из {start} в {end} нет пути"
+            )
+        layout = {
+            "pheromone": ((self.num_colonies, graph.num_edges), np.float64),
+            "history": ((self.num_colonies, 4, self.iterations), np.float64),
+            "best_paths": ((self.num_colonies, graph.num_nodes), np.int64),
+            "best_lengths": ((self.num_colonies,), np.int64),
+            "best_costs": ((self.num_colonies,), np.float64),
+        }
+        shared = SharedArrays(layout)
+        shared["pheromone"][:] = graph.pheromone_values
+        shared["best_lengths"][:] = 0
+        shared["best_costs"][:] = np.inf
+
+        # Процессы колоний и главный процесс встречаются на барьере дважды за
+        # обмен: после итераций колоний и после обмена феромонами
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(self.workers + 1)
+        errors = context.Queue()
+        config = {
+            "num_ants": self.num_ants,
+            "alpha": self.alpha,
+            "beta": self.beta,
+            "evaporation_rate": self.evaporation_rate,
+            "iterations": self.iterations,
+            "exchange_interval": self.exchange_interval,
+            "max_backtrack": self.max_backtrack,
+            "batch_size": self.batch_size,
+            "seeds": self.seed_sequence.spawn(self.num_colonies),
+        }
+        processes = [
+            context.Process(
+                target=_colony_worker,
+                args=(
+                    list(range(worker, self.num_colonies, self.workers)),
+                    graph, config, start, end, shared.name, layout, barrier, errors,
+                ),
+            )
+            for worker in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        try:
+            try:
+                for _ in range(0, self.iterations, self.exchange_interval):
+                    barrier.wait()
+                    self.exchange(shared)
+                    barrier.wait()
+            except BaseException:
+                # Процессы колоний ждут на барьере: сломанный барьер их отпустит
+                barrier.abort()
+                raise
+            finally:
+                for process in processes:
+                    process.join()
+            self.collect(shared)
+        except BrokenBarrierError:
+            raise RuntimeError(errors.get()) from None
+        finally:
+            shared.close()
+
+    def exchange(self, shared):
+        """
+        Обмен между колониями: кольцевое смешивание феромонов и
+        подкрепление лучшего пути всех колоний в каждой колонии.
+        """
+        pheromone = shared["pheromone"]
+        if self.num_colonies > 1 and self.migration_rate:
+            neighbor = np.roll(pheromone, 1, axis=0)
+            pheromone *= 1 - self.migration_rate
+            pheromone += self.migration_rate * neighbor
+
+        costs = shared["best_costs"]
+        best = int(np.argmin(costs))
+        if np.isfinite(costs[best]) and costs[best] > 0:
+            path = shared["best_paths"][best, : shared["best_lengths"][best]]
+            edges = [self.edge_id(u, v) for u, v in zip(path[:-1], path[1:])]
+            pheromone[:, edges] += 1.0 / costs[best]
+
+    def edge_id(self, u_id, v_id):
+        """Номер ребра (u, v) по номерам узлов."""
+        graph = self.graph
+        begin = graph.indptr[u_id]
+        row = graph.indices[begin : graph.indptr[u_id + 1]]
+        return int(begin + np.flatnonzero(row == v_id)[0])
+
+    def collect(self, shared):
+        """Собирает лучший путь и истории итераций по всем колониям."""
+        costs = shared["best_costs"]
+        self.colony_best_costs = costs.tolist()
+        best = int(np.argmin(costs))
+        if np.isfinite(costs[best]):
+            self.best_cost = costs[best].item()
+            path = shared["best_paths"][best, : shared["best_lengths"][best]]
+            self.best_path = [self.graph.labels[i] for i in path]
+
+        # history[c] = (застревания, лучшая стоимость, феромоны, вероятность)
+        history = shared["history"]
+        for i in range(self.iterations):
+            leader = int(np.argmin(history[:, 1, i]))
+            self.stack_path[i + 1] = int(history[:, 0, i].sum())
+            self.iter_path[i + 1] = history[leader, 1, i].item()
+            self.pheromons_path[i + 1] = history[:, 2, i].sum().item()
+            self.probabilities[i + 1] = history[leader, 3, i].item()
+
+
+def _colony_worker(colonies, graph, config, start, end, name, layout, barrier, errors):
+    """Процесс, ведущий колонии с номерами colonies."""
+    shared = SharedArrays(layout, name)
+    engines = {}
+    try:
+        for colony in colonies:
+            engine = VectorizedAntColonyOptimizer(
+                graph,
+                config["num_ants"],
+                config["alpha"],
+                config["beta"],
+                config["evaporation_rate"],
+                config["iterations"],
+                max_backtrack=config["max_backtrack"],
+                batch_size=config["batch_size"],
+                seed=config["seeds"][colony],
+            )
+            # Феромоны колонии — ее строка в общей памяти
+            engine.pheromone = shared["pheromone"][colony]
+            engines[colony] = engine
+
+        iterations = config["iterations"]
+        for first in range(0, iterations, config["exchange_interval"]):
+            last = min(first + config["exchange_interval"], iterations)
+            for colony, engine in engines.items():
+                for _ in range(first, last):
+                    engine.optimize_iteration(start, end)
+                    i = engine.iter
+                    shared["history"][colony, :, i - 1] = (
+                        engine.stack_path[i],
+                        engine.iter_path[i],
+                        engine.pheromons_path[i],
+                        engine.probabilities[i],
+                    )
+                if engine.best_path is not None:
+                    path = [engine.node_ids[node] for node in engine.best_path]
+                    shared["best_paths"][colony, : len(path)] = path
+                    shared["best_lengths"][colony] = len(path)
+                    shared["best_costs"][colony] = engine.best_cost
+            barrier.wait()  # Итерации колоний закончены
+            barrier.wait()  # Главный процесс провел обмен
+    except BaseException as error:
+        errors.put(f"Колонии {colonies}: {error!r}")
+        barrier.abort()
+    finally:
+        engines.clear()  # Массивы колоний ссылаются на общую память
+        shared.close()
@@ -0,0 +1,184 @@
+from bisect import bisect_right
+from itertools import accumulate, chain
+
+import numpy as np
+
+
+class TransitionCache:
+    def __init__(
+        self, graph, alpha, beta, attempts=8, candidates=None, rng=None, block=1 << 14
+    ):
+        """
+        Инициализирует кэш вероятностей перехода муравьев.
+
+        Эвристика eta^beta = (1 / weight) ** beta считается один раз для всех ребер.
+        Для каждого узла при первом обращении запоминаются привлекательности
+        его ребер tau^alpha * eta^beta и их накопленные суммы, по которым следующий
+        узел выбирается двоичным поиском. Строка узла пересчитывается, только если
+        изменились феромоны на его ребрах (см. invalidate).
+
+        В режиме списков кандидатов (candidates=k) муравей выбирает только среди
+        k ближайших по весу соседей и переходит к полному списку ребер, лишь
+        когда все кандидаты посещены.
+
+        Случайные числа берутся из генератора NumPy блоками по block штук,
+        поэтому на каждом шаге муравья нет отдельного обращения к генератору.
+
+        Параметры:
+        graph (FrozenGraph): Граф с феромонами в массиве pheromone_values.
+        alpha (float): Влияние уровня феромонов на выбор пути.
+        beta (float): Влияние расстояния на выбор пути.
+        attempts (int): Сколько раз выбирать ребро по всей строке, прежде чем
+            отбросить посещенных соседей явно.
+        candidates (int): Размер списка кандидатов k; None — выбирать среди всех соседей.
+        rng (np.random.Generator): Генератор случайных чисел; None — новый генератор
+            без зерна.
+        block (int): Сколько случайных чисел генерировать за раз.
+
+        Атрибуты:
+        eta_beta (np.ndarray): Эвристика по номерам ребер.
+        rows (dict): Узел -> (ребра, привлекательности, накопленные суммы).
+        candidate_rows (dict): То же только для ребер к k ближайшим соседям.
+        """
+        self.graph = graph
+        self.alpha = alpha
+        self.beta = beta
+        self.attempts = attempts
+        self.candidates = candidates
+        self.eta_beta = (1 / graph.weights) ** beta
+        # Номер узла-источника для каждого ребра
+        self.sources = np.repeat(np.arange(graph.num_nodes), np.diff(graph.indptr))
+        self.rows = {}
+        self.candidate_rows = {}
+        self.block = block
+        self.use_generator(rng or np.random.default_rng())
+
+    def use_generator(self, rng):
+        """
+        Переключает выбор ребер на генератор rng. Числа, заранее полученные
+        из прежнего генератора, отбрасываются.
+        """
+        self.rng = rng
+        # next_uniform() возвращает следующее число из [0, 1)
+        self.next_uniform = chain.from_iterable(self._uniform_blocks(rng)).__next__
+
+    def _uniform_blocks(self, rng):
+        """Бесконечно выдает блоки равномерных случайных чисел из генератора rng."""
+        while True:
+            yield rng.random(self.block).tolist()
+
+    def row(self, node):
+        """
+        Возвращает строку узла: (ребра, привлекательности, накопленные суммы);
+        ребра — в формате FrozenGraph.get_edges.
+        """
+        row = self.rows.get(node)
+        if row is None:
+            edges = self.graph.get_edges(node)
+            attractiveness = []
+            if edges:
+                begin = edges[0][2]
+                end = begin + len(edges)
+                tau = self.graph.pheromone_values[begin:end]
+                attractiveness = (tau**self.alpha * self.eta_beta[begin:end]).tolist()
+            row = (edges, attractiveness, list(accumulate(attractiveness)))
+            self.rows[node] = row
+        return row
+
+    def candidate_row(self, node):
+        """
+        Возвращает строку узла, ограниченную k ребрами наименьшего веса
+        (при равных весах — в порядке ребер графа).
+        """
+        row = self.candidate_rows.get(node)
+        if row is None:
+            edges, attractiveness, _ = self.row(node)
+            slots = sorted(range(len(edges)), key=lambda i: edges[i][1])
+            slots = slots[: self.candidates]
+            attractiveness = [attractiveness[i] for i in slots]
+            row = (
+                [edges[i] for i in slots],
+                attractiveness,
+                list(accumulate(attractiveness)),
+            )
+            self.candidate_rows[node] = row
+        return row
+
+    def choose(self, node, visited, use_candidates=True):
+        """
+        Выбирает ребро из узла node к непосещенному соседу с вероятностью,
+        пропорциональной привлекательности ребра.
+
+        Сначала ребро выбирается по всей строке (двоичный поиск по накопленным
+        суммам) и принимается, если сосед не посещен: это дает то же распределение,
+        что и выбор только среди непосещенных. Если попытки не удались, посещенные
+        соседи отбрасываются явно. В режиме списков кандидатов так же сначала
+        просматриваются кандидаты, а затем, если все они посещены, — все ребра.
+
+        Параметры:
+        node (int/str): Текущий узел.
+        visited (list/set): Посещенные узлы.
+        use_candidates (bool): False — выбирать сразу среди всех ребер, даже
+            в режиме списков кандидатов.
+
+        Возвращает:
+        tuple: Ребро (сосед, вес ребра, номер ребра) или None, если все соседи посещены.
+        """
+        if self.candidates and use_candidates:
+            edge = self._sample(self.candidate_row(node), visited)
+            if edge is not None:
+                return edge
+        return self._sample(self.row(node), visited)
+
+    def _sample(self, row, visited):
+        """Выбирает ребро строки row к непосещенному соседу или возвращает None."""
+        edges, attractiveness, cumulative = row
+        if not edges:
+            return None
+        total = cumulative[-1]
+        for _ in range(self.attempts):
+            i = bisect_right(cumulative, self.next_uniform() * total)
+            if i < len(edges) and edges[i][0] not in visited:
+                return edges[i]
+
+        candidates = [i for i, edge in enumerate(edges) if edge[0] not in visited]
+        if not candidates:
+            return None
+        cumulative = list(accumulate(attractiveness[i] for i in candidates))
+        i = bisect_right(cumulative, self.next_uniform() * cumulative[-1])
+        return edges[candidates[min(i, len(candidates) - 1)]]
+
+    def probability(self, u, v):
+        """
+        Возвращает вероятность выбора ребра (u, v) среди всех ребер узла u
+        (в режиме списков кандидатов — среди кандидатов, если v среди них).
+        """
+        row = self.row(u)
+        if self.candidates:
+            candidate_row = self.candidate_row(u)
+            if any(edge[0] == v for edge in candidate_row[0]):
+                row = candidate_row
+        edges, attractiveness, cumulative = row
+        chosen = 0
+        for i, edge in enumerate(edges):
+            if edge[0] == v:
+                chosen = attractiveness[i]
+        return chosen / cumulative[-1]
+
+    def invalidate(self, edges=None):
+        """
+        Сбрасывает строки узлов, из которых выходят ребра edges
+        (None — сбрасывает все строки).
+
+        Умножение всех феромонов на одно число (испарение) строки не сбрасывает:
+        привлекательности узла умножаются на общий множитель, и вероятности
+        перехода не меняются.
+        """
+        if edges is None:
+            self.rows.clear()
+            self.candidate_rows.clear()
+            return
+        labels = self.graph.labels
+        for node_id in np.unique(self.sources[edges]).tolist():
+            self.rows.pop(labels[node_id], None)
+            self.candidate_rows.pop(labels[node_id], None)
@@ -0,0 +1,402 @@
+import numpy as np
+import statistics as st
+
+from src.graph import NoPathError
+
+
+class VectorizedAntColonyOptimizer:
+    def __init__(
+        self,
+        graph,
+        num_ants,
+        alpha=1.0,
+        beta=2.0,
+        evaporation_rate=0.5,
+        iterations=100,
+        max_backtrack=3,
+        batch_size=None,
+        seed=None,
+    ):
+        """
+        Инициализирует векторизованный алгоритм муравьиной колонии.
+
+        В отличие от AntColonyOptimizer, все муравьи итерации двигаются
+        одновременно (шаг за шагом) по массивной копии графа: феромоны и
+        эвристика хранятся в массивах NumPy, выбор следующего узла делается
+        рулеткой по накопленным суммам сразу для всех муравьев, а посещенные
+        узлы хранятся в булевой матрице (муравей x узел).
+
+        Параметры:
+        graph (Graph/FrozenGraph): Граф, по которому будут перемещаться муравьи;
+            Graph замораживается через freeze(), феромоны хранятся в FrozenGraph.
+        num_ants (int): Количество муравьев.
+        alpha (float): Влияние уровня феромонов на выбор пути.
+        beta (float): Влияние расстояния на выбор пути.
+        evaporation_rate (float): Скорость испарения феромонов (0 < evaporation_rate < 1).
+        iterations (int): Количество итераций алгоритма.
+        max_backtrack (int): Сколько раз муравей может вернуться из тупика на шаг
+            назад, прежде чем начать путь заново.
+        batch_size (int): Сколько муравьев идут одновременно, между волнами
+            откладываются феромоны. None — все муравьи итерации в одной волне.
+        seed (int/np.random.SeedSequence): Зерно генератора случайных чисел.
+
+        Атрибуты:
+        best_path (list): Лучший найденный путь.
+        best_cost (float): Стоимость (длина) лучшего пути.
+        """
+        self.graph = graph.freeze()
+        self.num_ants = num_ants
+        self.alpha = alpha
+        self.beta = beta
+        self.evaporation_rate = evaporation_rate
+        self.iterations = iterations
+        self.max_backtrack = max_backtrack
+        self.batch_size = batch_size
+        self.best_path = None
+        self.stack_path = {}
+        self.iter_path = {}
+        self.pheromons_path = {}
+        self.probabilities = {}
+        self.probability = []
+        self.count = None
+        self.iter = 0
+        self.pheromone_cost = 0
+        self.best_cost = float("inf")  # Начальная стоимость задается как бесконечность
+        self.rng = np.random.default_rng(seed)
+        self.reachable = set()  # Пары (start, end), для которых путь уже проверен
+        self._build_arrays()
+
+    def _build_arrays(self):
+        """
+        Раскладывает CSR-массивы графа в матрицы фиксированной ширины.
+
+        Атрибуты:
+        labels (list): Имена узлов по их числовым номерам.
+        node_ids (dict): Номер узла по его имени.
+        neighbors (np.ndarray): Матрица (узел x max_степень) номеров соседей, -1 — пусто.
+        weights (np.ndarray): Веса ребер в той же раскладке.
+        edge_of (np.ndarray): Номер ребра в массиве феромонов в той же раскладке.
+        pheromone (np.ndarray): Уровень феромонов по номерам ребер (общий с графом).
+        eta_beta (np.ndarray): Эвристика (1 / weight) ** beta, считается один раз.
+        edge_eta_beta (np.ndarray): Та же эвристика по номерам ребер.
+        edge_source (np.ndarray): Начальный узел каждого ребра.
+        """
+        graph = self.graph
+        self.labels = graph.labels
+        self.node_ids = graph.node_ids
+
+        degrees = np.diff(graph.indptr)
+        shape = (graph.num_nodes, max(int(degrees.max(initial=0)), 1))
+        rows = np.repeat(np.arange(graph.num_nodes), degrees)
+        slots = np.arange(graph.num_edges) - np.repeat(graph.indptr[:-1], degrees)
+
+        self.neighbors = np.full(shape, -1, dtype=np.int64)
+        self.neighbors[rows, slots] = graph.indices
+        self.weights = np.ones(shape, dtype=float)
+        self.weights[rows, slots] = graph.weights
+        self.edge_of = np.zeros(shape, dtype=np.int64)
+        self.edge_of[rows, slots] = np.arange(graph.num_edges)
+
+        self.pheromone = graph.pheromone_values
+        self.valid = self.neighbors >= 0
+        self.eta_beta = np.where(self.valid, (1 / self.weights) ** self.beta, 0.0)
+        self.edge_eta_beta = (1 / graph.weights) ** self.beta
+        self.edge_source = rows
+
+    def edge_attractiveness(self):
+        """Возвращает привлекательности tau^alpha * eta^beta по номерам ребер."""
+        return self.pheromone**self.alpha * self.edge_eta_beta
+
+    def attractiveness(self):
+        """
+        Возвращает матрицу привлекательности ребер tau^alpha * eta^beta
+        в раскладке (узел x max_степень); для пустых ячеек — 0.
+        """
+        tau = self.pheromone[self.edge_of] if self.pheromone.size else self.eta_beta
+        return np.where(self.valid, tau**self.alpha * self.eta_beta, 0.0)
+
+    def optimize_iteration(self, start, end):
+        """
+        Выполняет одну итерацию алгоритма: перемещение всех муравьев, обновление феромонов.
+
+        Муравьи идут волнами по batch_size штук; феромоны откладываются после
+        того, как вся волна дошла до конечного узла, поэтому внутри волны
+        муравьи видят одинаковые феромоны. При batch_size=1 поведение совпадает
+        с поочередным движением муравьев в AntColonyOptimizer.
+
+        Параметры:
+        start (int/str): Стартовый узел.
+        end (int/str): Конечный узел.
+
+        Исключения:
+        NoPathError: Если из start в end нет пути или муравьи не нашли его
+            за num_ants * 10000 застреваний.
+        """
+        self.check_path(start, end)
+        self.count = 0
+        self.iter += 1
+
+        start_id = self.node_ids[start]
+        end_id = self.node_ids[end]
+        batch_size = self.batch_size or self.num_ants
+
+        for first in range(0, self.num_ants, batch_size):
+            num_ants = min(batch_size, self.num_ants - first)
+            paths, edges, lengths, costs = self.walk(num_ants, start_id, end_id)
+
+            # Проверяем, является ли маршрут одного из муравьев лучшим
+            # (при равенстве, как и в AntColonyOptimizer, побеждает последний муравей)
+            best_ant = num_ants - 1 - int(np.argmin(costs[::-1]))
+            if costs[best_ant] <= self.best_cost:
+                self.best_cost = costs[best_ant].item()
+                self.best_path = [
+                    self.labels[i] for i in paths[best_ant, : lengths[best_ant]]
+                ]
+                self.best_path_probability()
+
+            # Обновляем феромоны по маршрутам муравьев волны
+            self.pheromone_cost = self.update_pheromone(
+                edges, lengths, costs, self.pheromone_cost
+            )
+
+        self.pheromons_path[self.iter] = self.pheromone_cost
+
+        # Испаряем феромоны, чтобы избежать их чрезмерного накопления
+        self.evaporate_pheromone()
+        if st.median(self.probability) < 1 - st.median(self.probability):
+            self.probabilities[self.iter] = 1 - st.median(self.probability)
+        else:
+            self.probabilities[self.iter] = st.median(self.probability)
+
+        self.stack_path[self.iter] = self.count
+        self.iter_path[self.iter] = self.best_cost
+
+    def check_path(self, start, end):
+        """
+        Проверяет обходом в ширину, что из start можно дойти до end
+        (один раз для каждой пары узлов).
+
+        Исключения:
+        NoPathError: Если пути нет.
+        """
+        if (start, end) in self.reachable:
+            return
+        if not self.graph.has_path(start, end):
+            raise NoPathError(
+                f"Нет Гамельтонова цикла, потому что из {start} в {end} нет пути"
+            )
+        self.reachable.add((start, end))
+
+    def walk(self, num_ants, start_id, end_id):
+        """
+        Проводит num_ants муравьев от start_id до end_id одновременно.
+
+        Застрявший муравей, как и Ant.move, возвращается на шаг назад (не больше
+        max_backtrack раз), оставляя тупик посещенным; когда возвраты исчерпаны,
+        он начинает путь заново с начального узла.
+
+        Параметры:
+        num_ants (int): Количество муравьев в волне.
+        start_id (int): Номер стартового узла.
+        end_id (int): Номер конечного узла.
+
+        Возвращает:
+        tuple: (paths, edges, lengths, costs) — номера узлов и ребер маршрутов
+        (муравей x шаг), длины маршрутов в узлах и их стоимости.
+        """
+        graph = self.graph
+        num_nodes = len(self.labels)
+        weights = self.attractiveness()
+
+        # Накопленные суммы привлекательностей всех ребер в порядке CSR: ребра
+        # узла u занимают отрезок [low[u], low[u] + span[u]) этих сумм
+        cumulative = np.cumsum(self.edge_attractiveness())
+        bounds = np.concatenate(([0.0], cumulative))[graph.indptr]
+        low, span = bounds[:-1], np.diff(bounds)
+        row_start, row_end = graph.indptr[:-1], graph.indptr[1:] - 1
+        # Пустые ячейки указывают на начальный узел: он всегда посещен
+        neighbors = np.where(self.valid, self.neighbors, start_id)
+
+        visited = np.zeros((num_ants, num_nodes), dtype=bool)
+        visited[:, start_id] = True
+        # Плоский вид visited: клетка (муравей, узел) — ant * num_nodes + узел
+        seen = visited.reshape(-1)
+        # Маршруты хранятся номерами ребер (муравей x шаг); узлы и стоимости
+        # восстанавливаются по ним в конце. Буфер растет вдвое по мере надобности
+        edges = np.zeros((num_ants, min(64, max(num_nodes - 1, 1))), dtype=np.int64)
+        lengths = np.ones(num_ants, dtype=np.int64)
+        longest = 1  # Оценка сверху длины самого длинного маршрута
+        current = np.full(num_ants, start_id, dtype=np.int64)
+        backtracks = np.zeros(num_ants, dtype=np.int64)
+
+        # Номера муравьев, которые еще не дошли до конечного узла
+        active = np.arange(num_ants) if start_id != end_id else np.arange(0)
+
+        while active.size:
+            if longest > edges.shape[1]:
+                longest = int(lengths.max())
+                if longest > edges.shape[1]:
+                    edges = np.concatenate((edges, np.zeros_like(edges)), axis=1)
+            longest += 1
+
+            # Рулетка по всем ребрам узла, как в TransitionCache: ребро
+            # принимается, если сосед не посещен, — это то же распределение,
+            # что и выбор только среди непосещенных соседей
+            nodes = current[active]
+            threshold = low[nodes] + self.rng.random(active.size) * span[nodes]
+            edge = np.searchsorted(cumulative, threshold, side="right")
+            np.minimum(edge, row_end[nodes], out=edge)
+            next_nodes = graph.indices[edge]
+            cells = active * num_nodes + next_nodes
+            accepted = ~seen[cells] & (edge >= row_start[nodes])
+
+            if accepted.all():
+                moving = active
+            else:
+                # Отвергнутые муравьи выбирают явно среди непосещенных соседей
+                rejected = np.flatnonzero(~accepted)
+                chosen, found = self.choose_unvisited(
+                    active[rejected], nodes[rejected], neighbors, seen, weights
+                )
+                stuck = rejected[~found]
+                rejected = rejected[found]
+                edge[rejected] = chosen
+                next_nodes[rejected] = graph.indices[chosen]
+                cells[rejected] = active[rejected] * num_nodes + next_nodes[rejected]
+
+                if stuck.size:
+                    self.backtrack(
+                        active[stuck],
+                        start_id,
+                        visited,
+                        edges,
+                        lengths,
+                        current,
+                        backtracks,
+                    )
+                    if self.count > self.num_ants * 10000:
+                        raise NoPathError(
+                            f"Муравьи не нашли путь из {self.labels[start_id]} "
+                            f"в {self.labels[end_id]} за {self.count} застреваний"
+                        )
+
+                    # На этом шаге двигаются только не застрявшие муравьи
+                    movers = np.ones(active.size, dtype=bool)
+                    movers[stuck] = False
+                    moving = active[movers]
+                    edge, next_nodes = edge[movers], next_nodes[movers]
+                    cells = cells[movers]
+                else:
+                    moving = active
+
+            steps = lengths[moving]
+            edges[moving, steps - 1] = edge
+            lengths[moving] = steps + 1
+            seen[cells] = True
+            current[moving] = next_nodes
+
+            active = active[current[active] != end_id]
+
+        # Узлы и стоимости маршрутов по номерам их ребер
+        width = int(lengths.max(initial=1))
+        edges = edges[:, : width - 1]
+        paths = np.empty((num_ants, width), dtype=np.int64)
+        paths[:, 0] = start_id
+        paths[:, 1:] = graph.indices[edges]
+        walked = np.arange(width - 1) < lengths[:, None] - 1
+        costs = np.where(walked, graph.weights[edges], 0.0).sum(axis=1)
+        return paths, edges, lengths, costs
+
+    def backtrack(self, ants, start_id, visited, edges, lengths, current, backtracks):
+        """
+        Обрабатывает застрявших муравьев ants: как и Ant.move, муравей
+        возвращается на шаг назад (не больше max_backtrack раз), оставляя тупик
+        посещенным; когда возвраты исчерпаны, он начинает путь заново.
+        Массивы состояния муравьев меняются на месте.
+        """
+        self.count += ants.size
+
+        # Застрявшие муравьи возвращаются на шаг назад, пока есть возвраты
+        back = (backtracks[ants] < self.max_backtrack) & (lengths[ants] > 1)
+        returning = ants[back]
+        backtracks[returning] += 1
+        lengths[returning] -= 1
+        current[returning] = self.edge_source[edges[returning, lengths[returning] - 1]]
+
+        # Остальные начинают путь заново с начального узла
+        restarted = ants[~back]
+        visited[restarted] = False
+        visited[restarted, start_id] = True
+        lengths[restarted] = 1
+        current[restarted] = start_id
+        backtracks[restarted] = 0
+
+    def choose_unvisited(self, ants, nodes, neighbors, seen, weights):
+        """
+        Рулетка только среди непосещенных соседей для муравьев ants,
+        стоящих в узлах nodes.
+
+        Параметры:
+        ants (np.ndarray): Номера муравьев.
+        nodes (np.ndarray): Их текущие узлы.
+        neighbors (np.ndarray): Матрица соседей, пустые ячейки которой указывают
+            на посещенный узел.
+        seen (np.ndarray): Плоская матрица посещенных узлов (муравей x узел).
+        weights (np.ndarray): Привлекательности ребер (см. attractiveness).
+
+        Возвращает:
+        tuple: (edges, found) — номера выбранных ребер для муравьев, у которых
+        есть непосещенный сосед, и маска таких муравьев.
+        """
+        unvisited = ~seen[ants[:, None] * len(self.labels) + neighbors[nodes]]
+        found = unvisited.any(axis=1)
+        nodes, unvisited = nodes[found], unvisited[found]
+
+        cumulative = np.cumsum(np.where(unvisited, weights[nodes], 0.0), axis=1)
+        threshold = self.rng.random(nodes.size) * cumulative[:, -1]
+        choice = (cumulative <= threshold[:, None]).sum(axis=1)
+        # Как и в TransitionCache, выход за сумму дает последнего непосещенного
+        last = unvisited.shape[1] - 1 - np.argmax(unvisited[:, ::-1], axis=1)
+        np.minimum(choice, last, out=choice)
+        return self.edge_of[nodes, choice], found
+
+    def update_pheromone(self, edges, lengths, costs, pheromone_cost):
+        """
+        Добавляет феромоны на маршрутах всех муравьев волны одной операцией.
+
+        Параметры:
+        edges (np.ndarray): Номера ребер маршрутов (муравей x шаг).
+        lengths (np.ndarray): Длины маршрутов в узлах.
+        costs (np.ndarray): Стоимости маршрутов.
+        pheromone_cost (float): Накопленная сумма феромонов на пройденных ребрах.
+        """
+        steps = lengths - 1
+        mask = np.arange(edges.shape[1]) < steps[:, None]
+        walked = edges[mask]
+        with np.errstate(divide="ignore"):
+            deposit = np.repeat(1.0 / costs, steps)
+        np.add.at(self.pheromone, walked, deposit)
+        return pheromone_cost + self.pheromone[walked].sum().item()
+
+    def evaporate_pheromone(self):
+        """
+        Испаряет часть феромонов на всех ребрах графа, уменьшая их уровни.
+        """
+        self.pheromone *= 1 - self.evaporation_rate
+
+    def best_path_probability(self):
+        """
+        Считает вероятность выбора каждого ребра лучшего пути среди всех
+        ребер, выходящих из того же узла.
+        """
+        ids = np.array([self.node_ids[node] for node in self.best_path], dtype=np.int64)
+        if ids.size < 2:
+            self.probability = []
+            return
+        weights = self.attractiveness()
+        rows, targets = ids[:-1], ids[1:]
+        # Последнее вхождение соседа в строке, как в AntColonyOptimizer
+        matches = self.neighbors[rows] == targets[:, None]
+        slots = matches.shape[1] - 1 - np.argmax(matches[:, ::-1], axis=1)
+        chosen = weights[rows, slots]
+        self.probability = (chosen / weights[rows].sum(axis=1)).tolist()
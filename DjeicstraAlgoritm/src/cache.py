@@ -0,0 +1,145 @@
+from collections import OrderedDict
+
+
+class ShortestPathCache:
+    """
+    Класс ShortestPathCache — кэш перед DijkstraAlgorithm.find_shortest_path.
+    Для каждого начального узла хранится целое дерево кратчайших путей, поэтому
+    один поиск отвечает на запросы к любым конечным узлам. Деревья вытесняются по
+    принципу LRU, когда их больше max_trees или суммарно в них больше max_nodes узлов.
+    Кэш подписан на изменения ребер графа и сбрасывает только затронутые деревья:
+    при добавлении ребра (u, v, w) или уменьшении его веса — те, где u достижим и
+    distance[u] + w < distance[v]; при увеличении веса или удалении — те, где ребро
+    (u, v) входит в дерево (parent[v] == u).
+    """
+
+    def __init__(self, algorithm, max_trees=128, max_nodes=None):
+        """
+        algorithm: объект DijkstraAlgorithm
+        max_trees: наибольшее число хранимых деревьев
+        max_nodes: наибольшее суммарное число узлов во всех деревьях (None — без ограничения)
+        """
+        self.algorithm = algorithm
+        self.max_trees = max_trees
+        self.max_nodes = max_nodes
+        self.trees = OrderedDict()  # start_node -> (distances, parents)
+        self.cached_nodes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        if hasattr(algorithm.graph, "add_listener"):
+            algorithm.graph.add_listener(self.on_edge_change)
+
+    def close(self):
+        """
+        Метод close отписывает кэш от изменений графа и очищает его.
+        """
+        if hasattr(self.algorithm.graph, "remove_listener"):
+            self.algorithm.graph.remove_listener(self.on_edge_change)
+        self.clear()
+
+    def find_shortest_path(self, start_node, end_node):
+        """
+        Метод find_shortest_path отвечает так же, как DijkstraAlgorithm.find_shortest_path,
+        но берет путь из кэшированного дерева кратчайших путей от start_node.
+        start_node: начальный узел
+        end_node: конечный узел
+        Возвращает:
+        - path: список узлов, представляющий кратчайший путь
+        - distance: суммарное расстояние этого пути
+        """
+        distances, parents = self.tree(start_node)
+
+        path = []
+        node = end_node
+        while node is not None:
+            path.append(node)
+            node = parents.get(node)
+
+        return path[::-1], distances.get(end_node, float("inf"))
+
+    def tree(self, start_node):
+        """
+        Метод tree возвращает дерево кратчайших путей (distances, parents) от start_node,
+        при промахе строит его и добавляет в кэш.
+        """
+        if start_node in self.trees:
+            self.hits += 1
+            self.trees.move_to_end(start_node)
+            return self.trees[start_node]
+
+        self.misses += 1
+        tree = self.algorithm.shortest_path_tree(start_node)
+        self.trees[start_node] = tree
+        self.cached_nodes += len(tree[0])
+        self._evict()
+        return tree
+
+    def _evict(self):
+        """Вытесняет давно не использованные деревья, пока кэш не уложится в лимиты."""
+        while len(self.trees) > 1 and (
+            len(self.trees) > self.max_trees
+            or (self.max_nodes is not None and self.cached_nodes > self.max_nodes)
+        ):
+            _, (distances, _) = self.trees.popitem(last=False)
+            self.cached_nodes -= len(distances)
+            self.evictions += 1
+
+    def on_edge_change(self, from_node, to_node, old_weight, new_weight):
+        """
+        Метод on_edge_change вызывается графом при изменении ребра и удаляет деревья,
+        в которых ребро дает более короткий путь или в которых ребро стало длиннее
+        либо удалено, хотя входит в дерево.
+        old_weight, new_weight: вес ребра до и после изменения (None — ребра нет)
+        """
+        decreased = new_weight is not None and (
+            old_weight is None or new_weight < old_weight
+        )
+        increased = old_weight is not None and (
+            new_weight is None or new_weight > old_weight
+        )
+        for start_node in list(self.trees):
+            distances, parents = self.trees[start_node]
+            if decreased and from_node in distances:
+                if distances[from_node] + new_weight < distances.get(
+                    to_node, float("inf")
+                ):
+                    self.invalidate(start_node)
+            elif increased and parents.get(to_node) == from_node:
+                self.invalidate(start_node)
+
+    def invalidate(self, start_node=None):
+        """
+        Метод invalidate удаляет дерево для start_node (None — все деревья).
+        """
+        if start_node is None:
+            self.invalidations += len(self.trees)
+            self.clear()
+            return
+        if start_node in self.trees:
+            distances, _ = self.trees.pop(start_node)
+            self.cached_nodes -= len(distances)
+            self.invalidations += 1
+
+    def clear(self):
+        """
+        Метод clear удаляет все деревья, не меняя счетчики.
+        """
+        self.trees.clear()
+        self.cached_nodes = 0
+
+    def stats(self):
+        """
+        Метод stats возвращает счетчики попаданий, промахов, вытеснений и сбросов.
+        """
+        queries = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / queries if queries else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "trees": len(self.trees),
+            "cached_nodes": self.cached_nodes,
+        }
@@ -0,0 +1,345 @@
+import heapq
+import os
+import time
+
+import numpy as np
+
+
+class ContractionHierarchy:
+    """
+    Класс ContractionHierarchy — индекс иерархий сжатия (contraction hierarchies) для
+    многократных запросов кратчайшего пути в неизменяемом графе.
+
+    При построении узлы по очереди «сжимаются» (удаляются из графа) в порядке важности,
+    а чтобы расстояния между оставшимися узлами не изменились, добавляются ребра-сокращения
+    u -> w через сжатый узел v, если нет другого пути u -> w не длиннее (поиск свидетеля).
+    Запрос — двунаправленный Дейкстра только по ребрам, ведущим к более важным узлам,
+    поэтому он обрабатывает малую часть графа, а расстояния совпадают с обычным Дейкстрой.
+    """
+
+    def __init__(self, graph, witness_limit=64):
+        """
+        Строит индекс по графу.
+        graph: объект Graph или FrozenGraph
+        witness_limit: сколько узлов может обработать один поиск свидетеля; меньший предел
+            ускоряет построение ценой лишних сокращений (на точность не влияет)
+        """
+        self.witness_limit = witness_limit
+        self.settled_nodes = 0
+        started = time.time()
+        self._build(graph.freeze())
+        self.stats = {
+            "preprocessing_time": time.time() - started,
+            "nodes": len(self.labels),
+            "edges": self.num_edges,
+            "shortcuts": len(self.shortcut_middle),
+            "index_bytes": self.index_bytes(),
+        }
+
+    def _build(self, graph):
+        """Сжимает узлы и строит восходящие графы поиска."""
+        self.labels = list(graph.labels)
+        self.node_ids = graph.node_ids
+        num_nodes = len(self.labels)
+        indptr, indices, weights = graph.adjacency()
+
+        # Оставшийся граф: out_edges[u][w] = вес, in_edges[w][u] = вес (параллельные
+        # ребра сливаются в самое легкое, петли отбрасываются)
+        out_edges = [{} for _ in range(num_nodes)]
+        in_edges = [{} for _ in range(num_nodes)]
+        for u in range(num_nodes):
+            for edge in range(indptr[u], indptr[u + 1]):
+                w, weight = indices[edge], weights[edge]
+                if w != u and weight < out_edges[u].get(w, float("inf")):
+                    out_edges[u][w] = weight
+                    in_edges[w][u] = weight
+        self.num_edges = sum(len(edges) for edges in out_edges)
+
+        # Все ребра итогового индекса: (u, w) -> вес; через какой узел идет сокращение
+        all_edges = {
+            (u, w): weight
+            for u in range(num_nodes)
+            for w, weight in out_edges[u].items()
+        }
+        self.shortcut_middle = {}
+
+        rank = [0] * num_nodes
+        contracted = [False] * num_nodes
+        deleted_neighbors = [0] * num_nodes
+        queue = [
+            (self._priority(v, out_edges, in_edges, deleted_neighbors), v)
+            for v in range(num_nodes)
+        ]
+        heapq.heapify(queue)
+
+        order = 0
+        while queue:
+            _, v = heapq.heappop(queue)
+            if contracted[v]:
+                continue
+            # Ленивое обновление: приоритет пересчитывается перед сжатием
+            priority = self._priority(v, out_edges, in_edges, deleted_neighbors)
+            if queue and priority > queue[0][0]:
+                heapq.heappush(queue, (priority, v))
+                continue
+
+            for u, w, weight in self._shortcuts(v, out_edges, in_edges):
+                if weight < out_edges[u].get(w, float("inf")):
+                    out_edges[u][w] = weight
+                    in_edges[w][u] = weight
+                    all_edges[(u, w)] = weight
+                    self.shortcut_middle[(u, w)] = v
+
+            for w in out_edges[v]:
+                del in_edges[w][v]
+                deleted_neighbors[w] += 1
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                deleted_neighbors[u] += 1
+            out_edges[v], in_edges[v] = {}, {}
+            contracted[v] = True
+            rank[v] = order
+            order += 1
+
+        # Прямой поиск идет по ребрам к более важным узлам, обратный — по входящим
+        # ребрам из более важных узлов
+        up = [[] for _ in range(num_nodes)]
+        down = [[] for _ in range(num_nodes)]
+        for (u, w), weight in all_edges.items():
+            if rank[w] > rank[u]:
+                up[u].append((w, weight))
+            else:
+                down[w].append((u, weight))
+        self.rank = rank
+        self.up = up
+        self.down = down
+
+    def _shortcuts(self, v, out_edges, in_edges):
+        """Возвращает сокращения (u, w, вес), нужные при сжатии узла v."""
+        shortcuts = []
+        targets = out_edges[v]
+        for u, weight_in in in_edges[v].items():
+            outgoing = [weight for w, weight in targets.items() if w != u]
+            if not outgoing:
+                continue
+            distances = self._witness_search(u, v, weight_in + max(outgoing), out_edges)
+            for w, weight_out in targets.items():
+                if w == u:
+                    continue
+                weight = weight_in + weight_out
+                if distances.get(w, float("inf")) > weight:
+                    shortcuts.append((u, w, weight))
+        return shortcuts
+
+    def _witness_search(self, source, excluded, limit, out_edges):
+        """Ограниченный поиск Дейкстры от source в оставшемся графе без узла excluded."""
+        distances = {source: 0}
+        priority_queue = [(0, source)]
+        settled = 0
+        while priority_queue and settled < self.witness_limit:
+            distance, node = heapq.heappop(priority_queue)
+            if distance > distances[node]:
+                continue
+            if distance > limit:
+                break
+            settled += 1
+            for neighbor, weight in out_edges[node].items():
+                if neighbor == excluded:
+                    continue
+                candidate = distance + weight
+                if candidate < distances.get(neighbor, float("inf")):
+                    distances[neighbor] = candidate
+                    heapq.heappush(priority_queue, (candidate, neighbor))
+        return distances
+
+    def _priority(self, v, out_edges, in_edges, deleted_neighbors):
+        """Важность узла: разность числа добавляемых и удаляемых ребер плюс число
+        уже сжатых соседей (чтобы сжатие шло равномерно по графу)."""
+        added = len(self._shortcuts(v, out_edges, in_edges))
+        removed = len(out_edges[v]) + len(in_edges[v])
+        return added - removed + deleted_neighbors[v]
+
+    def find_shortest_path(self, start_node, end_node):
+        """
+        Метод find_shortest_path находит кратчайший путь от start_node до end_node
+        по индексу. Возвращает то же, что и DijkstraAlgorithm.find_shortest_path:
+        - path: список узлов, представляющий кратчайший путь
+        - distance: суммарное расстояние этого пути
+        """
+        self.settled_nodes = 0
+        if start_node == end_node:
+            return [start_node], 0
+        start_id = self.node_ids.get(start_node)
+        end_id = self.node_ids.get(end_node)
+        if start_id is None or end_id is None:
+            return [end_node], float("inf")
+
+        # Индекс 0 — прямой поиск по up, 1 — обратный по down
+        graphs = (self.up, self.down)
+        queues = ([(0, start_id)], [(0, end_id)])
+        distances = ({start_id: 0}, {end_id: 0})
+        parents = ({start_id: None}, {end_id: None})
+        best_distance = float("inf")
+        meeting_node = None
+
+        while queues[0] or queues[1]:
+            tops = [queue[0][0] if queue else float("inf") for queue in queues]
+            if min(tops) >= best_distance:
+                break
+            side = 0 if tops[0] <= tops[1] else 1
+            distance, node = heapq.heappop(queues[side])
+            if distance > distances[side][node]:
+                continue
+            self.settled_nodes += 1
+
+            other = distances[1 - side]
+            if node in other and distance + other[node] < best_distance:
+                best_distance = distance + other[node]
+                meeting_node = node
+
+            for neighbor, weight in graphs[side][node]:
+                candidate = distance + weight
+                if candidate < distances[side].get(neighbor, float("inf")):
+                    distances[side][neighbor] = candidate
+                    parents[side][neighbor] = node
+                    heapq.heappush(queues[side], (candidate, neighbor))
+
+        if meeting_node is None:
+            return [end_node], float("inf")
+
+        # Цепочка узлов индекса: от start до точки встречи и от нее до end
+        chain = []
+        node = meeting_node
+        while node is not None:
+            chain.append(node)
+            node = parents[0][node]
+        chain.reverse()
+        node = parents[1][meeting_node]
+        while node is not None:
+            chain.append(node)
+            node = parents[1][node]
+
+        path = [chain[0]]
+        for u, w in zip(chain, chain[1:]):
+            path.extend(self._unpack(u, w))
+        return [self.labels[node] for node in path], best_distance
+
+    def _unpack(self, u, w):
+        """Раскрывает ребро (u, w) в исходные ребра; возвращает узлы пути без u."""
+        nodes = []
+        stack = [(u, w)]
+        while stack:
+            a, b = stack.pop()
+            middle = self.shortcut_middle.get((a, b))
+            if middle is None:
+                nodes.append(b)
+            else:
+                stack.append((middle, b))
+                stack.append((a, middle))
+        return nodes
+
+    def index_bytes(self):
+        """Размер индекса в сериализованном виде (массивы save()) в байтах."""
+        return sum(array.nbytes for array in self._arrays().values())
+
+    def _arrays(self):
+        """Массивы индекса для сохранения."""
+        arrays = {"rank": np.asarray(self.rank, dtype=np.int64)}
+        for name, graph in (("up", self.up), ("down", self.down)):
+            indptr = np.zeros(len(graph) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(edges) for edges in graph])
+            arrays[name + "_indptr"] = indptr
+            arrays[name + "_indices"] = np.array(
+                [neighbor for edges in graph for neighbor, _ in edges], dtype=np.int32
+            )
+            arrays[name + "_weights"] = np.array(
+                [weight for edges in graph for _, weight in edges]
+            )
+        arrays["shortcuts"] = np.array(
+            [(u, w, middle) for (u, w), middle in self.shortcut_middle.items()],
+            dtype=np.int32,
+        ).reshape(-1, 3)
+        return arrays
+
+    def save(self, path):
+        """
+        Метод save сохраняет индекс в файл .npz (расширение добавляется, если его нет).
+        Имена узлов сохраняются целыми числами, если все они целые, иначе строками.
+        path: путь к файлу
+        """
+        if all(isinstance(label, int) for label in self.labels):
+            labels = np.array(self.labels, dtype=np.int64)
+        else:
+            labels = np.array([str(label) for label in self.labels], dtype=str)
+        np.savez(
+            _npz_path(path),
+            labels=labels,
+            **{"stats_" + name: np.array(value) for name, value in self.stats.items()},
+            **self._arrays(),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Метод load загружает индекс, сохраненный методом save.
+        path: путь к файлу (тот же, что и при сохранении)
+        """
+        with np.load(_npz_path(path)) as data:
+            data = dict(data)
+        index = cls.__new__(cls)
+        index.settled_nodes = 0
+        index.labels = data["labels"].tolist()
+        index.node_ids = {label: i for i, label in enumerate(index.labels)}
+        index.rank = data["rank"].tolist()
+        for name in ("up", "down"):
+            indptr = data[name + "_indptr"].tolist()
+            indices = data[name + "_indices"].tolist()
+            weights = data[name + "_weights"].tolist()
+            edges = list(zip(indices, weights))
+            setattr(
+                index,
+                name,
+                [edges[indptr[u] : indptr[u + 1]] for u in range(len(index.labels))],
+            )
+        index.shortcut_middle = {
+            (u, w): middle for u, w, middle in data["shortcuts"].tolist()
+        }
+        index.stats = {
+            name[len("stats_") :]: data[name].item()
+            for name in data
+            if name.startswith("stats_")
+        }
+        index.num_edges = index.stats["edges"]
+        index.witness_limit = None
+        return index
+
+
+def _npz_path(path):
+    """Добавляет к пути расширение .npz, как это делает np.savez."""
+    path = os.fspath(path)
+    return path if path.endswith(".npz") else path + ".npz"
+
+
+def measure_speedup(algorithm, index, queries):
+    """
+    Функция measure_speedup сравнивает время запросов DijkstraAlgorithm и индекса.
+    algorithm: объект DijkstraAlgorithm
+    index: объект ContractionHierarchy
+    queries: список пар (start_node, end_node)
+    Возвращает словарь со временем обоих способов, ускорением и числом обработанных узлов.
+    """
+    report = {}
+    for name, search in (("dijkstra", algorithm), ("contraction", index)):
+        settled = 0
+        started = time.time()
+        for start_node, end_node in queries:
+            search.find_shortest_path(start_node, end_node)
+            settled += search.settled_nodes
+        report[name + "_time"] = time.time() - started
+        report[name + "_settled"] = settled
+    report["speedup"] = (
+        report["dijkstra_time"] / report["contraction_time"]
+        if report["contraction_time"] > 0
+        else float("inf")
+    )
+    return report
@@ -1,4 +1,29 @@
 import heapq
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.graph import FrozenGraph
+
+
+def euclidean_heuristic(graph):
+    """
+    Функция euclidean_heuristic возвращает эвристику A* по координатам узлов графа:
+    евклидово расстояние от узла до цели. Эвристика допустима, если вес каждого ребра
+    не меньше расстояния между его концами. Для узлов без координат возвращается 0.
+    graph: граф с заполненным словарем coordinates
+    """
+    coordinates = graph.coordinates
+
+    def heuristic(node, goal):
+        if node not in coordinates or goal not in coordinates:
+            return 0
+        (x1, y1), (x2, y2) = coordinates[node], coordinates[goal]
+        return math.hypot(x1 - x2, y1 - y2)
+
+    return heuristic
 
 
 class DijkstraAlgorithm:
@@ -13,6 +38,9 @@ class DijkstraAlgorithm:
         graph: объект класса Graph
         """
         self.graph = graph
+        self.settled_nodes = 0  # Сколько узлов окончательно обработал последний поиск
+        self._frozen = None  # CSR-копия графа для пакетных методов
+        self._frozen_version = None
 
     def find_shortest_path(self, start_node, end_node):
         """
@@ -23,6 +51,9 @@ class DijkstraAlgorithm:
         - path: список узлов, представляющий кратчайший путь
         - distance: суммарное расстояние этого пути
         """
+        if isinstance(self.graph, FrozenGraph):
+            return self._find_shortest_path_frozen(start_node, end_node)
+
         # Очередь с приоритетом для обработки узлов в порядке увеличения расстояния
         priority_queue = []
         heapq.heappush(priority_queue, (0, start_node))
@@ -32,11 +63,17 @@ class DijkstraAlgorithm:
 
         # Словарь для восстановления пути
         parents = {start_node: None}
+        self.settled_nodes = 0
 
         while priority_queue:
             # Извлечение узла с минимальным расстоянием
             current_distance, current_node = heapq.heappop(priority_queue)
 
+            # Устаревшая запись: узел уже извлечен с меньшим расстоянием
+            if current_distance > distances[current_node]:
+                continue
+            self.settled_nodes += 1
+
             # Если достигли конечного узла, можно завершить
             if current_node == end_node:
                 break
@@ -59,3 +96,339 @@ class DijkstraAlgorithm:
             node = parents.get(node)
 
         return path[::-1], distances.get(end_node, float("inf"))
+
+    def shortest_path_tree(self, start_node):
+        """
+        Метод shortest_path_tree находит дерево кратчайших путей от start_node
+        до всех достижимых узлов (поиск без остановки на конечном узле).
+        start_node: начальный узел
+        Возвращает:
+        - distances: словарь узел -> кратчайшее расстояние
+        - parents: словарь узел -> предыдущий узел на кратчайшем пути (None для start_node)
+        """
+        priority_queue = [(0, start_node)]
+        distances = {start_node: 0}
+        parents = {start_node: None}
+        self.settled_nodes = 0
+
+        while priority_queue:
+            current_distance, current_node = heapq.heappop(priority_queue)
+            if current_distance > distances[current_node]:
+                continue
+            self.settled_nodes += 1
+
+            for neighbor, weight in self.graph.get_neighbors(current_node):
+                distance = current_distance + weight
+                if neighbor not in distances or distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    parents[neighbor] = current_node
+                    heapq.heappush(priority_queue, (distance, neighbor))
+
+        return distances, parents
+
+    def _find_shortest_path_frozen(self, start_node, end_node):
+        """
+        Метод _find_shortest_path_frozen — тот же алгоритм для FrozenGraph:
+        поиск идет по числовым номерам узлов и CSR-массивам вместо словарей.
+        """
+        graph = self.graph
+        start_id = graph.node_ids.get(start_node)
+        end_id = graph.node_ids.get(end_node)
+        self.settled_nodes = 0
+        if start_id is None or end_id is None:
+            path = [end_node] if start_node != end_node else [start_node]
+            distance = 0 if start_node == end_node else float("inf")
+            return path, distance
+
+        distances, parents, self.settled_nodes = _dijkstra(
+            graph.adjacency(), graph.num_nodes, start_id, {end_id}
+        )
+        return self._path_to(graph, parents, end_id), distances[end_id]
+
+    def _path_to(self, graph, parents, end_id):
+        """Восстанавливает путь до узла end_id по массиву родителей."""
+        path = []
+        node_id = end_id
+        while node_id != -1:
+            path.append(graph.labels[node_id])
+            node_id = parents[node_id]
+        return path[::-1]
+
+    def frozen_graph(self):
+        """
+        Метод frozen_graph возвращает CSR-копию графа для пакетных методов.
+        Копия Graph строится один раз и перестраивается, только если граф изменился.
+        """
+        if isinstance(self.graph, FrozenGraph):
+            return self.graph
+        if self._frozen is None or self._frozen_version != self.graph.version:
+            self._frozen = self.graph.freeze()
+            self._frozen_version = self.graph.version
+        return self._frozen
+
+    def single_source(self, start_node):
+        """
+        Метод single_source находит кратчайшие расстояния от start_node до всех узлов.
+        start_node: начальный узел
+        Возвращает:
+        - distances: массив расстояний по номерам узлов frozen_graph() (inf — узел недостижим)
+        - parents: массив номеров предыдущих узлов на кратчайших путях (-1 — нет)
+        """
+        graph = self.frozen_graph()
+        distances = np.full(graph.num_nodes, np.inf)
+        parents = np.full(graph.num_nodes, -1, dtype=np.int64)
+        start_id = graph.node_ids.get(start_node)
+        self.settled_nodes = 0
+        if start_id is not None:
+            found, previous, self.settled_nodes = _dijkstra(
+                graph.adjacency(), graph.num_nodes, start_id
+            )
+            distances[:] = found
+            parents[:] = previous
+        return distances, parents
+
+    def one_to_many(self, start_node, end_nodes):
+        """
+        Метод one_to_many находит кратчайшие пути от start_node до каждого из end_nodes
+        за один поиск, который останавливается, как только все end_nodes обработаны.
+        start_node: начальный узел
+        end_nodes: конечные узлы
+        Возвращает словарь end_node -> (path, distance) в формате find_shortest_path.
+        """
+        graph = self.frozen_graph()
+        start_id = graph.node_ids.get(start_node)
+        self.settled_nodes = 0
+        if start_id is None:
+            return {
+                end_node: ([end_node], 0) if end_node == start_node
+                else ([end_node], float("inf"))
+                for end_node in end_nodes
+            }
+
+        end_ids = {graph.node_ids[node] for node in end_nodes if node in graph.node_ids}
+        distances, parents, self.settled_nodes = _dijkstra(
+            graph.adjacency(), graph.num_nodes, start_id, end_ids
+        )
+        result = {}
+        for end_node in end_nodes:
+            end_id = graph.node_ids.get(end_node)
+            if end_id is None:
+                result[end_node] = ([end_node], float("inf"))
+            else:
+                result[end_node] = (
+                    self._path_to(graph, parents, end_id),
+                    distances[end_id],
+                )
+        return result
+
+    def distance_matrix(self, start_nodes=None, end_nodes=None, workers=None):
+        """
+        Метод distance_matrix строит матрицу кратчайших расстояний.
+        Каждая строка — один поиск от start_node, который останавливается, когда все
+        end_nodes обработаны. Строки считаются в пуле процессов: CSR-массивы графа
+        передаются каждому процессу один раз при его запуске.
+        start_nodes: начальные узлы (по умолчанию — все узлы)
+        end_nodes: конечные узлы (по умолчанию — все узлы)
+        workers: число процессов; 1 — считать в текущем процессе, None — по числу ядер
+        Возвращает массив размера len(start_nodes) x len(end_nodes), inf — пути нет.
+        """
+        graph = self.frozen_graph()
+        start_nodes = graph.labels if start_nodes is None else list(start_nodes)
+        end_nodes = graph.labels if end_nodes is None else list(end_nodes)
+        start_ids = [graph.node_ids.get(node, -1) for node in start_nodes]
+        end_ids = [graph.node_ids.get(node, -1) for node in end_nodes]
+
+        matrix = np.full((len(start_ids), len(end_ids)), np.inf)
+        workers = workers or os.cpu_count() or 1
+        executor = None
+        if workers == 1 or len(start_ids) < 2:
+            _init_matrix_worker(graph.adjacency(), graph.num_nodes, end_ids)
+            rows = map(_distance_row, start_ids)
+        else:
+            executor = ProcessPoolExecutor(
+                workers,
+                initializer=_init_matrix_worker,
+                initargs=(graph.adjacency(), graph.num_nodes, end_ids),
+            )
+            chunk = max(1, len(start_ids) // (workers * 4))
+            rows = executor.map(_distance_row, start_ids, chunksize=chunk)
+        try:
+            for i, row in enumerate(rows):
+                matrix[i] = row
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Путь из узла в него самого имеет длину 0, даже если узла нет в графе
+        for i, start_node in enumerate(start_nodes):
+            for j, end_node in enumerate(end_nodes):
+                if start_node == end_node:
+                    matrix[i, j] = 0
+        return matrix
+
+    def find_shortest_path_bidirectional(self, start_node, end_node):
+        """
+        Метод find_shortest_path_bidirectional находит кратчайший путь двунаправленным
+        алгоритмом Дейкстры: поиск идет одновременно от start_node по ребрам и от end_node
+        по обратным ребрам (get_reverse_neighbors) и останавливается, когда сумма минимальных
+        расстояний в двух очередях не меньше длины лучшего найденного пути.
+        start_node: начальный узел
+        end_node: конечный узел
+        Возвращает то же, что и find_shortest_path: (path, distance)
+        """
+        self.settled_nodes = 0
+        if start_node == end_node:
+            return [start_node], 0
+
+        # Индекс 0 — прямой поиск, 1 — обратный
+        queues = ([(0, start_node)], [(0, end_node)])
+        distances = ({start_node: 0}, {end_node: 0})
+        parents = ({start_node: None}, {end_node: None})
+        expand = (self.graph.get_neighbors, self.graph.get_reverse_neighbors)
+        best_distance = float("inf")
+        meeting_node = None
+
+        while queues[0] and queues[1]:
+            if queues[0][0][0] + queues[1][0][0] >= best_distance:
+                break
+
+            # Расширяем ту сторону, у которой очередь меньше
+            side = 0 if len(queues[0]) <= len(queues[1]) else 1
+            current_distance, current_node = heapq.heappop(queues[side])
+            if current_distance > distances[side][current_node]:
+                continue
+            self.settled_nodes += 1
+
+            other_distances = distances[1 - side]
+            for neighbor, weight in expand[side](current_node):
+                distance = current_distance + weight
+                if neighbor not in distances[side] or distance < distances[side][neighbor]:
+                    distances[side][neighbor] = distance
+                    parents[side][neighbor] = current_node
+                    heapq.heappush(queues[side], (distance, neighbor))
+                # Путь через ребро (current_node, neighbor) соединяет два поиска
+                if neighbor in other_distances:
+                    total = distance + other_distances[neighbor]
+                    if total < best_distance:
+                        best_distance = total
+                        meeting_node = neighbor
+
+        if meeting_node is None:
+            return [end_node], float("inf")
+
+        # Склеиваем путь: от start_node до точки встречи и от нее до end_node
+        path = []
+        node = meeting_node
+        while node is not None:
+            path.append(node)
+            node = parents[0].get(node)
+        path.reverse()
+        node = parents[1].get(meeting_node)
+        while node is not None:
+            path.append(node)
+            node = parents[1].get(node)
+        return path, best_distance
+
+    def find_shortest_path_astar(self, start_node, end_node, heuristic=None):
+        """
+        Метод find_shortest_path_astar находит кратчайший путь алгоритмом A*: узлы
+        извлекаются в порядке расстояние + heuristic(узел, end_node). При допустимой
+        эвристике (не больше настоящего расстояния до цели) путь кратчайший.
+        start_node: начальный узел
+        end_node: конечный узел
+        heuristic: функция heuristic(node, goal); по умолчанию — евклидово расстояние
+            по координатам графа (euclidean_heuristic), без координат A* совпадает с Дейкстрой
+        Возвращает то же, что и find_shortest_path: (path, distance)
+        """
+        if heuristic is None:
+            heuristic = euclidean_heuristic(self.graph)
+
+        priority_queue = [(heuristic(start_node, end_node), 0, start_node)]
+        distances = {start_node: 0}
+        parents = {start_node: None}
+        self.settled_nodes = 0
+
+        while priority_queue:
+            _, current_distance, current_node = heapq.heappop(priority_queue)
+            if current_distance > distances[current_node]:
+                continue
+            self.settled_nodes += 1
+
+            if current_node == end_node:
+                break
+
+            for neighbor, weight in self.graph.get_neighbors(current_node):
+                distance = current_distance + weight
+                if neighbor not in distances or distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    parents[neighbor] = current_node
+                    heapq.heappush(
+                        priority_queue,
+                        (distance + heuristic(neighbor, end_node), distance, neighbor),
+                    )
+
+        path = []
+        node = end_node
+        while node is not None:
+            path.append(node)
+            node = parents.get(node)
+
+        return path[::-1], distances.get(end_node, float("inf"))
+
+
+def _dijkstra(adjacency, num_nodes, start_id, end_ids=None):
+    """
+    Функция _dijkstra — алгоритм Дейкстры по CSR-спискам (indptr, indices, weights).
+    Поиск останавливается, когда обработаны все узлы end_ids (None — искать до конца).
+    Возвращает списки расстояний и родителей по номерам узлов и число обработанных узлов.
+    """
+    indptr, indices, weights = adjacency
+    inf = float("inf")
+    distances = [inf] * num_nodes
+    parents = [-1] * num_nodes
+    distances[start_id] = 0
+    remaining = set(end_ids) if end_ids is not None else None
+    settled = 0
+
+    priority_queue = [(0, start_id)]
+    while priority_queue:
+        current_distance, current_id = heapq.heappop(priority_queue)
+
+        # Устаревшая запись: узел уже извлечен с меньшим расстоянием
+        if current_distance > distances[current_id]:
+            continue
+        settled += 1
+
+        if remaining is not None:
+            remaining.discard(current_id)
+            if not remaining:
+                break
+
+        for edge in range(indptr[current_id], indptr[current_id + 1]):
+            neighbor = indices[edge]
+            distance = current_distance + weights[edge]
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                parents[neighbor] = current_id
+                heapq.heappush(priority_queue, (distance, neighbor))
+
+    return distances, parents, settled
+
+
+# Данные процесса, считающего строки матрицы расстояний
+_matrix_graph = None
+
+
+def _init_matrix_worker(adjacency, num_nodes, end_ids):
+    global _matrix_graph
+    _matrix_graph = (adjacency, num_nodes, end_ids)
+
+
+def _distance_row(start_id):
+    """Строка матрицы расстояний от узла start_id до всех end_ids."""
+    adjacency, num_nodes, end_ids = _matrix_graph
+    if start_id == -1:
+        return [float("inf")] * len(end_ids)
+    targets = {end_id for end_id in end_ids if end_id != -1}
+    distances, _, _ = _dijkstra(adjacency, num_nodes, start_id, targets)
+    return [distances[end_id] if end_id != -1 else float("inf") for end_id in end_ids]
@@ -0,0 +1,132 @@
+import heapq
+
+
+class DynamicShortestPaths:
+    """
+    Класс DynamicShortestPaths — дерево кратчайших путей от одного начального узла,
+    которое поддерживается при изменении весов ребер без полного пересчета
+    (в духе алгоритма Рамалингама — Репса).
+
+    Дерево подписано на изменения ребер Graph и исправляет только затронутую часть:
+    - вес ребра (u, v) уменьшился или ребро добавлено: если путь через u стал короче,
+      улучшения распространяются от v поиском Дейкстры, который заходит только
+      в узлы с уменьшившимся расстоянием;
+    - вес ребра (u, v) увеличился или ребро удалено: если ребро входит в дерево,
+      расстояния пересчитываются только для поддерева v — сначала по входящим
+      ребрам из незатронутых узлов, затем поиском Дейкстры внутри поддерева.
+    Поэтому стоимость обновления зависит от числа затронутых узлов и их ребер,
+    а не от размера графа.
+    """
+
+    def __init__(self, graph, start_node):
+        """
+        Строит дерево кратчайших путей от start_node и подписывается на изменения графа.
+        graph: объект Graph (нужны get_neighbors, get_reverse_neighbors и add_listener)
+        start_node: начальный узел
+        """
+        self.graph = graph
+        self.start_node = start_node
+        self.distances = {start_node: 0}
+        self.parents = {start_node: None}
+        self.updated_nodes = 0  # Сколько узлов затронуло последнее обновление
+        self._propagate([(0, start_node)])
+        graph.add_listener(self.on_edge_change)
+
+    def close(self):
+        """
+        Метод close отписывает дерево от изменений графа.
+        """
+        self.graph.remove_listener(self.on_edge_change)
+
+    def find_shortest_path(self, end_node):
+        """
+        Метод find_shortest_path возвращает кратчайший путь от start_node до end_node
+        по текущему дереву (так же, как DijkstraAlgorithm.find_shortest_path):
+        - path: список узлов, представляющий кратчайший путь
+        - distance: суммарное расстояние этого пути
+        """
+        path = []
+        node = end_node
+        while node is not None:
+            path.append(node)
+            node = self.parents.get(node)
+
+        return path[::-1], self.distances.get(end_node, float("inf"))
+
+    def on_edge_change(self, from_node, to_node, old_weight, new_weight):
+        """
+        Метод on_edge_change вызывается графом при изменении ребра и исправляет дерево.
+        old_weight, new_weight: вес ребра до и после изменения (None — ребра нет)
+        """
+        self.updated_nodes = 0
+        if from_node == to_node or old_weight == new_weight:
+            return
+        if new_weight is not None and (old_weight is None or new_weight < old_weight):
+            self._decrease(from_node, to_node, new_weight)
+        elif self.parents.get(to_node) == from_node:
+            self._increase(to_node)
+
+    def _decrease(self, from_node, to_node, weight):
+        """Распространяет улучшение, которое дает более легкое ребро from_node -> to_node."""
+        if from_node not in self.distances:
+            return
+        distance = self.distances[from_node] + weight
+        if distance < self.distances.get(to_node, float("inf")):
+            self.distances[to_node] = distance
+            self.parents[to_node] = from_node
+            self._propagate([(distance, to_node)])
+
+    def _increase(self, root):
+        """Пересчитывает поддерево root, ребро в который стало длиннее или удалено."""
+        distances = self.distances
+        parents = self.parents
+
+        # Поддерево root: дети узла — соседи, у которых он записан родителем
+        affected = {root}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            for neighbor, _ in self.graph.get_neighbors(node):
+                if neighbor not in affected and parents.get(neighbor) == node:
+                    affected.add(neighbor)
+                    stack.append(neighbor)
+
+        # Начальные расстояния — по входящим ребрам из незатронутых узлов дерева
+        priority_queue = []
+        for node in affected:
+            best_distance, best_parent = float("inf"), None
+            for source, weight in self.graph.get_reverse_neighbors(node):
+                if source in distances and source not in affected:
+                    if distances[source] + weight < best_distance:
+                        best_distance, best_parent = distances[source] + weight, source
+            if best_parent is None:
+                del distances[node], parents[node]
+            else:
+                distances[node], parents[node] = best_distance, best_parent
+                priority_queue.append((best_distance, node))
+
+        heapq.heapify(priority_queue)
+        self._propagate(priority_queue)
+        self.updated_nodes = max(self.updated_nodes, len(affected))
+
+    def _propagate(self, priority_queue):
+        """
+        Поиск Дейкстры от узлов очереди: узлы, расстояния до которых уменьшились,
+        передают улучшение своим соседям.
+        """
+        distances = self.distances
+        parents = self.parents
+        settled = 0
+        while priority_queue:
+            current_distance, current_node = heapq.heappop(priority_queue)
+            if current_distance > distances.get(current_node, float("inf")):
+                continue
+            settled += 1
+
+            for neighbor, weight in self.graph.get_neighbors(current_node):
+                distance = current_distance + weight
+                if distance < distances.get(neighbor, float("inf")):
+                    distances[neighbor] = distance
+                    parents[neighbor] = current_node
+                    heapq.heappush(priority_queue, (distance, neighbor))
+        self.updated_nodes += settled
@@ -1,3 +1,9 @@
+import mmap
+import os
+
+import numpy as np
+
+
 class Graph:
     """
     Класс Graph представляет граф, который используется для хранения ребер.
@@ -6,17 +12,110 @@ class Graph:
 
     def __init__(self):
         self.edges = {}
+        self.reverse_edges = {}  # Обратный индекс: узел -> входящие ребра (откуда, вес)
+        self.coordinates = {}  # Необязательные координаты узлов для эвристики A*
+        self.version = 0  # Увеличивается при каждом изменении графа
+        # Функции listener(from_node, to_node, old_weight, new_weight), вызываемые
+        # при каждом изменении ребер
+        self.listeners = []
 
     def add_edge(self, from_node, to_node, weight):
         """
         Метод add_edge добавляет ребро между двумя узлами с указанным весом.
+        Уже существующее ребро не заменяется: добавляется параллельное ребро
+        (для изменения веса есть update_edge).
         from_node: начальный узел
         to_node: конечный узел
         weight: вес ребра
         """
+        # Прежний вес ребра нужен только подписчикам
+        old_weight = self.edge_weight(from_node, to_node) if self.listeners else None
         if from_node not in self.edges:
             self.edges[from_node] = []
         self.edges[from_node].append((to_node, weight))
+        if to_node not in self.reverse_edges:
+            self.reverse_edges[to_node] = []
+        self.reverse_edges[to_node].append((from_node, weight))
+        new_weight = weight if old_weight is None else min(old_weight, weight)
+        self._changed(from_node, to_node, old_weight, new_weight)
+
+    def update_edge(self, from_node, to_node, weight):
+        """
+        Метод update_edge задает новый вес ребра from_node -> to_node
+        (всем параллельным ребрам между этими узлами).
+        from_node: начальный узел
+        to_node: конечный узел
+        weight: новый вес ребра
+        Если ребра нет, вызывает KeyError.
+        """
+        old_weight = self.edge_weight(from_node, to_node)
+        if old_weight is None:
+            raise KeyError((from_node, to_node))
+        self.edges[from_node] = [
+            (node, weight if node == to_node else w)
+            for node, w in self.edges[from_node]
+        ]
+        self.reverse_edges[to_node] = [
+            (node, weight if node == from_node else w)
+            for node, w in self.reverse_edges[to_node]
+        ]
+        self._changed(from_node, to_node, old_weight, weight)
+
+    def remove_edge(self, from_node, to_node):
+        """
+        Метод remove_edge удаляет ребро from_node -> to_node
+        (вместе со всеми параллельными ребрами между этими узлами).
+        from_node: начальный узел
+        to_node: конечный узел
+        Если ребра нет, вызывает KeyError.
+        """
+        old_weight = self.edge_weight(from_node, to_node)
+        if old_weight is None:
+            raise KeyError((from_node, to_node))
+        self.edges[from_node] = [
+            (node, w) for node, w in self.edges[from_node] if node != to_node
+        ]
+        self.reverse_edges[to_node] = [
+            (node, w) for node, w in self.reverse_edges[to_node] if node != from_node
+        ]
+        self._changed(from_node, to_node, old_weight, None)
+
+    def edge_weight(self, from_node, to_node):
+        """
+        Метод edge_weight возвращает вес ребра from_node -> to_node
+        (наименьший среди параллельных ребер) или None, если ребра нет.
+        """
+        weights = [w for node, w in self.edges.get(from_node, []) if node == to_node]
+        return min(weights) if weights else None
+
+    def _changed(self, from_node, to_node, old_weight, new_weight):
+        """Отмечает изменение графа и сообщает о нем подписчикам."""
+        self.version += 1
+        for listener in self.listeners:
+            listener(from_node, to_node, old_weight, new_weight)
+
+    def add_listener(self, listener):
+        """
+        Метод add_listener подписывает функцию listener(from_node, to_node, old_weight,
+        new_weight) на изменения ребер (например, чтобы сбрасывать кэши кратчайших
+        путей). old_weight и new_weight — вес ребра (наименьший среди параллельных)
+        до и после изменения; None — ребра нет (добавлено или удалено).
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Метод remove_listener отписывает функцию, добавленную add_listener.
+        """
+        self.listeners.remove(listener)
+
+    def set_coordinates(self, node, x, y):
+        """
+        Метод set_coordinates задает координаты узла (используются эвристикой A*).
+        node: узел
+        x, y: координаты узла
+        """
+        self.coordinates[node] = (x, y)
 
     def get_neighbors(self, node):
         """
@@ -24,3 +123,216 @@ class Graph:
         node: узел, для которого ищутся соседи
         """
         return self.edges.get(node, [])
+
+    def get_reverse_neighbors(self, node):
+        """
+        Метод get_reverse_neighbors возвращает список узлов, из которых есть ребро в node,
+        и весов этих ребер.
+        node: узел, для которого ищутся входящие ребра
+        """
+        return self.reverse_edges.get(node, [])
+
+    def freeze(self):
+        """
+        Метод freeze строит компактную неизменяемую копию графа в формате CSR.
+        Возвращает объект FrozenGraph с числовыми номерами узлов.
+        """
+        labels = list(self.edges)
+        node_ids = {label: i for i, label in enumerate(labels)}
+        for neighbors in self.edges.values():
+            for to_node, _ in neighbors:
+                if to_node not in node_ids:
+                    node_ids[to_node] = len(labels)
+                    labels.append(to_node)
+
+        degrees = [len(self.edges.get(label, [])) for label in labels]
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(degrees)
+        num_edges = int(indptr[-1])
+        indices = np.fromiter(
+            (node_ids[to_node] for label in labels for to_node, _ in self.edges.get(label, [])),
+            dtype=np.int32,
+            count=num_edges,
+        )
+        # Тип весов (целые или вещественные) сохраняется, чтобы расстояния не менялись
+        weights = np.array(
+            [weight for label in labels for _, weight in self.edges.get(label, [])]
+        )
+        frozen = FrozenGraph(labels, indptr, indices, weights)
+        frozen.coordinates = dict(self.coordinates)
+        return frozen
+
+
+class FrozenGraph:
+    """
+    Класс FrozenGraph представляет неизменяемый граф в формате CSR.
+    Узлы пронумерованы числами, соседи узла с номером i — indices[indptr[i]:indptr[i + 1]],
+    веса ребер лежат в weights по тем же позициям.
+    """
+
+    def __init__(self, labels, indptr, indices, weights):
+        self.labels = list(labels)
+        self.node_ids = {label: i for i, label in enumerate(self.labels)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights)
+        self.coordinates = {}
+        self.version = 0  # Замороженный граф не меняется
+        self._adjacency = None
+        self._reverse_adjacency = None
+
+    @property
+    def num_nodes(self):
+        return len(self.labels)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def freeze(self):
+        """Граф уже заморожен, поэтому возвращается он сам."""
+        return self
+
+    def adjacency(self):
+        """
+        Метод adjacency возвращает списки Python (indptr, indices, weights).
+        Чтение элементов из списков в цикле быстрее, чем из массивов NumPy,
+        поэтому списки строятся один раз и кэшируются.
+        """
+        if self._adjacency is None:
+            self._adjacency = (
+                self.indptr.tolist(),
+                self.indices.tolist(),
+                self.weights.tolist(),
+            )
+        return self._adjacency
+
+    def reverse_adjacency(self):
+        """
+        Метод reverse_adjacency возвращает обратный индекс в том же виде, что и adjacency():
+        для каждого узла — номера узлов, из которых в него ведут ребра, и веса этих ребер.
+        """
+        if self._reverse_adjacency is None:
+            degrees = np.diff(self.indptr)
+            sources = np.repeat(np.arange(self.num_nodes, dtype=np.int32), degrees)
+            order = np.argsort(self.indices, kind="stable")
+            indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum(np.bincount(self.indices, minlength=self.num_nodes))
+            self._reverse_adjacency = (
+                indptr.tolist(),
+                sources[order].tolist(),
+                self.weights[order].tolist(),
+            )
+        return self._reverse_adjacency
+
+    def get_neighbors(self, node):
+        """
+        Метод get_neighbors возвращает список соседних узлов и весов ребер для заданного узла.
+        node: узел, для которого ищутся соседи
+        """
+        return self._neighbors(node, self.adjacency())
+
+    def get_reverse_neighbors(self, node):
+        """
+        Метод get_reverse_neighbors возвращает список узлов, из которых есть ребро в node,
+        и весов этих ребер.
+        node: узел, для которого ищутся входящие ребра
+        """
+        return self._neighbors(node, self.reverse_adjacency())
+
+    def _neighbors(self, node, adjacency):
+        node_id = self.node_ids.get(node)
+        if node_id is None:
+            return []
+        indptr, indices, weights = adjacency
+        begin, end = indptr[node_id], indptr[node_id + 1]
+        return [
+            (self.labels[to_id], weight)
+            for to_id, weight in zip(indices[begin:end], weights[begin:end])
+        ]
+
+
+def read_edge_arrays(path, chunk_size=1 << 26):
+    """
+    Функция read_edge_arrays читает файл ребер формата "u v w" (разделители — любые
+    пробелы и табуляции). Файл отображается в память и разбирается кусками по
+    chunk_size байт, граница куска сдвигается до конца строки.
+    path: путь к файлу
+    chunk_size: размер куска в байтах
+    Возвращает (sources, targets, weights): имена узлов как массивы байтовых строк и веса.
+    """
+    sources, targets, weights = [], [], []
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return np.array([], dtype="S1"), np.array([], dtype="S1"), np.array([])
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            begin = 0
+            while begin < len(data):
+                end = min(begin + chunk_size, len(data))
+                if end < len(data):
+                    # Кусок заканчивается на конце строки; если в куске нет ни
+                    # одного конца строки, он продлевается до ближайшего
+                    newline = data.rfind(b"\n", begin, end)
+                    if newline < 0:
+                        newline = data.find(b"\n", end)
+                    end = newline + 1 if newline >= 0 else len(data)
+                tokens = data[begin:end].split()
+                begin = end
+                if len(tokens) % 3:
+                    raise ValueError(
+                        f"{path}: в каждой строке должно быть три поля: u v w"
+                    )
+                tokens = np.array(tokens)
+                sources.append(tokens[0::3])
+                targets.append(tokens[1::3])
+                weights.append(tokens[2::3])
+
+    weights = np.concatenate(weights)
+    try:
+        weights = weights.astype(np.int64)
+    except ValueError:
+        weights = weights.astype(float)
+    return np.concatenate(sources), np.concatenate(targets), weights
+
+
+def load_edge_list(path, cache=False):
+    """
+    Функция load_edge_list загружает граф из файла ребер "u v w" сразу в FrozenGraph,
+    минуя add_edge. Целые веса остаются целыми, как и при freeze().
+    path: путь к файлу
+    cache: сохранять рядом двоичную копию path + ".npz" и при следующих загрузках
+        читать ее, если исходный файл не изменился
+    Возвращает FrozenGraph с именами узлов-строками.
+    """
+    cache_path = path + ".npz"
+    stat = os.stat(path)
+    if cache and os.path.exists(cache_path):
+        with np.load(cache_path) as data:
+            if data["source"].tolist() == [stat.st_size, stat.st_mtime_ns]:
+                return FrozenGraph(
+                    data["labels"].tolist(),
+                    data["indptr"],
+                    data["indices"],
+                    data["weights"],
+                )
+
+    sources, targets, weights = read_edge_arrays(path)
+    # Имена узлов заменяются номерами (узлы идут в порядке сортировки имен)
+    names, ids = np.unique(np.concatenate([sources, targets]), return_inverse=True)
+    source_ids, target_ids = ids[: len(sources)], ids[len(sources) :]
+    order = np.argsort(source_ids, kind="stable")
+    indptr = np.zeros(len(names) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(source_ids, minlength=len(names)))
+    labels = np.char.decode(names).tolist() if len(names) else []
+    graph = FrozenGraph(labels, indptr, target_ids[order], weights[order])
+
+    if cache:
+        np.savez(
+            cache_path,
+            labels=np.array(labels, dtype=str),
+            indptr=graph.indptr,
+            indices=graph.indices,
+            weights=graph.weights,
+            source=np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64),
+        )
+    return graph